@@ -5,12 +5,7 @@ Explicit run command for Automaton Auditor
 Usage:
     python run.py https://github.com/user/repo reports/report.pdf
 """
-from dotenv import load_dotenv  # Add this import
-
-# Load environment variables from .env file
-load_dotenv()
 import sys
-from src.graph import run_full_audit  # Changed from run_detective_phase
 
 if __name__ == "__main__":
     if len(sys.argv) != 3:
@@ -18,6 +13,11 @@ if __name__ == "__main__":
         print("   Example: python run.py https://github.com/langchain-ai/langgraph reports/interim_report.pdf")
         sys.exit(1)
 
+    # Deferred: importing never loads .env or LangGraph, and neither does a usage error
+    from dotenv import load_dotenv
+    load_dotenv()
+    from src.graph import run_full_audit
+
     repo_url = sys.argv[1]
     pdf_path = sys.argv[2]
 
@@ -29,7 +29,7 @@ if __name__ == "__main__":
     result = run_full_audit(repo_url, pdf_path)  # Changed function call
 
     # Print summary
-    total_evidence = sum(len(e) for e in result["evidences"].values())
+    total_evidence = result.get("evidence_count", 0)
     total_opinions = len(result.get("opinions", []))
     has_report = "Yes" if result.get("final_report") else "No"
     
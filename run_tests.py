@@ -1,8 +1,11 @@
 #!/usr/bin/env python
 """ test runner"""
 
-import subprocess
+import os
 import sys
+from concurrent.futures import ProcessPoolExecutor
+
+import pytest
 
 tests = [
     "tests/test_state.py",
@@ -10,20 +13,32 @@ tests = [
     "tests/test_graph.py"
 ]
 
-print("=" * 50)
-print("🧪 RUNNING MINIMAL TESTS")
-print("=" * 50)
-
-passed = 0
-for test in tests:
-    print(f"\n📋 Running {test}...")
-    result = subprocess.run([sys.executable, test])
-    if result.returncode == 0:
-        passed += 1
-        print(f"✅ {test} PASSED")
-    else:
-        print(f"❌ {test} FAILED")
-
-print("\n" + "=" * 50)
-print(f"📊 SUMMARY: {passed}/{len(tests)} test suites passed")
-print("=" * 50)
\ No newline at end of file
+
+def run_suite(test: str) -> int:
+    """Run a single test file with pytest and return its exit code"""
+    return int(pytest.main([test, "-q"]))
+
+
+if __name__ == "__main__":
+    print("=" * 50)
+    print("🧪 RUNNING MINIMAL TESTS")
+    print("=" * 50)
+
+    # Suites are independent - run them concurrently, one worker per file at most
+    workers = min(len(tests), os.cpu_count() or 1)
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        results = list(pool.map(run_suite, tests))
+
+    passed = 0
+    for test, rc in zip(tests, results):
+        if rc == 0:
+            passed += 1
+            print(f"✅ {test} PASSED")
+        else:
+            print(f"❌ {test} FAILED")
+
+    print("\n" + "=" * 50)
+    print(f"📊 SUMMARY: {passed}/{len(tests)} test suites passed")
+    print("=" * 50)
+
+    sys.exit(0 if passed == len(tests) else 1)
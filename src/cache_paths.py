@@ -0,0 +1,20 @@
+"""Where the on-disk caches live - one per-user root shared by every cache"""
+
+import os
+from pathlib import Path
+
+def cache_root() -> Path:
+    """
+    $AUDIT_CACHE_DIR if set, else $XDG_CACHE_HOME/automaton-auditor
+    (~/.cache/automaton-auditor when XDG_CACHE_HOME is unset or empty).
+    """
+    override = os.getenv("AUDIT_CACHE_DIR")
+    if override:
+        return Path(override)
+    # An empty XDG_CACHE_HOME counts as unset - it must not resolve relative to the cwd
+    xdg = os.getenv("XDG_CACHE_HOME")
+    return (Path(xdg) if xdg else Path.home() / ".cache") / "automaton-auditor"
+
+def cache_dir(name: str) -> Path:
+    """Directory for one cache ("repos", "pdf", "opinions") under the cache root"""
+    return cache_root() / name
@@ -5,8 +5,6 @@ import argparse
 import sys
 from pathlib import Path
 
-from .graph import run_detective_phase
-
 def main():
     """Main CLI entry point"""
     parser = argparse.ArgumentParser(
@@ -34,17 +32,26 @@ def main():
         help="Output file for results (JSON format)"
     )
     
+    parser.add_argument(
+        "--resumable",
+        action="store_true",
+        help="Checkpoint graph state with MemorySaver so the run can be resumed"
+    )
+    
     args = parser.parse_args()
+
+    # Imported only after argparse succeeds - --help never pays for LangGraph
+    from .graph import run_detective_phase
     
     print(f"\n🔍 Automaton Auditor - Analyzing {args.repo_url}")
     print(f"📄 Using report: {args.pdf_path}")
     print("-" * 50)
     
     # Run the graph
-    result = run_detective_phase(args.repo_url, args.pdf_path)
+    result = run_detective_phase(args.repo_url, args.pdf_path, resumable=args.resumable)
     
     # Print summary
-    total_evidence = sum(len(e) for e in result["evidences"].values())
+    total_evidence = result.get("evidence_count", 0)
     print(f"\n📊 Collected {total_evidence} evidence items")
     
     if args.verbose:
@@ -70,8 +77,10 @@ def main():
             }
         }
         
+        # Compact JSON, serialized once and written in one call
+        payload = json.dumps(output_data, separators=(",", ":"))
         with open(args.output, 'w') as f:
-            json.dump(output_data, f, indent=2)
+            f.write(payload)
         print(f"\n💾 Results saved to {args.output}")
     
     return 0
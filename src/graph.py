@@ -1,55 +1,181 @@
 """Complete StateGraph with parallel detectives, judges, and synthesis - HIGHEST SCORE"""
 
+import asyncio
+import hashlib
+import inspect
+import os
+import time
+from collections import OrderedDict
+from functools import lru_cache, wraps
+
 from langgraph.graph import StateGraph, START, END
+from langgraph.checkpoint.base import BaseCheckpointSaver
 from langgraph.checkpoint.memory import MemorySaver
-from typing import Dict, Any, Literal
+from langgraph.types import Command, Send
+from typing import Dict, Any, List, Literal, Optional, Tuple
 
 from .state import AgentState
-from .nodes.detectives import (
-    repo_investigator_node,
-    doc_analyst_node,
-    evidence_aggregator_node
-)
+from .nodes.detectives import repo_investigator_node, doc_analyst_node
 from .nodes.vision_inspector import vision_inspector_node
 from .nodes.judges import prosecutor_node, defense_node, tech_lead_node
 from .nodes.justice import chief_justice_node
-from .rubric_loader import RubricLoader
+from .rubric_loader import get_rubric
+from .tools.repo_tools import remote_head
+
+# Which rubric artifact each detective is responsible for
+DETECTIVE_ARTIFACTS = {
+    "repo_investigator": "github_repo",
+    "doc_analyst": "pdf_report",
+    "vision_inspector": "pdf_images",
+}
+
+# Judge personas fanned out in parallel once evidence is collected
+JUDGE_NODES = ["prosecutor", "defense", "tech_lead"]
+
+# Ceiling on concurrently running nodes - protects LLM rate limits and network
+MAX_CONCURRENCY = 5
+
+# Detective outputs are deterministic per artifact - reuse them for an hour
+DETECTIVE_CACHE_TTL = 3600
+# Bound on cached detective outputs - least recently used entries are evicted first
+DETECTIVE_CACHE_SIZE = 32
+
+# ============= DETECTIVE CACHING =============
+
+# (node name, artifact key) -> (stored at, state update), least recently used first
+_node_cache: OrderedDict[Tuple[Any, ...], Tuple[float, Dict[str, Any]]] = OrderedDict()
+
+def repo_cache_key(state: AgentState) -> Optional[Tuple[Any, ...]]:
+    """Repository detective output depends on the repo URL and its current HEAD commit"""
+    head = remote_head(state["repo_url"])
+    if head is None:
+        return None  # Unreachable remote - nothing worth caching
+    return (state["repo_url"], head)
+
+def pdf_cache_key(state: AgentState) -> Optional[Tuple[Any, ...]]:
+    """PDF detective output depends on the file - a new mtime means a new report"""
+    try:
+        return (state["pdf_path"], os.path.getmtime(state["pdf_path"]))
+    except OSError:
+        return None  # Missing PDF - nothing worth caching
+
+def _is_clean(update: Dict[str, Any]) -> bool:
+    """Failure evidence (confidence 0) is never cached - the next run should retry"""
+    return all(
+        ev.confidence > 0
+        for ev_list in update.get("evidences", {}).values()
+        for ev in ev_list
+    )
+
+def cached_node(name: str, node, key_func, ttl: float = DETECTIVE_CACHE_TTL,
+                maxsize: int = DETECTIVE_CACHE_SIZE):
+    """
+    Memoize a detective node's state update per artifact key for ttl seconds.
+    Repeat audits of the same repo/PDF in this process skip clone, AST and PDF parsing.
+    Every caller gets its own shallow copy of the cached update.
+    """
+    def lookup(key):
+        if key is None:
+            return None
+        hit = _node_cache.get(key)
+        if hit is None:
+            return None
+        if time.monotonic() - hit[0] >= ttl:
+            del _node_cache[key]  # Expired - evict instead of keeping it around
+            return None
+        _node_cache.move_to_end(key)
+        return dict(hit[1])
+
+    def store(key, update: Dict[str, Any]) -> Dict[str, Any]:
+        if key is not None and _is_clean(update):
+            _node_cache[key] = (time.monotonic(), dict(update))
+            _node_cache.move_to_end(key)
+            while len(_node_cache) > maxsize:
+                _node_cache.popitem(last=False)
+        return update
+
+    def make_key(artifact_key):
+        return None if artifact_key is None else (name, *artifact_key)
+
+    if inspect.iscoroutinefunction(node):
+        @wraps(node)
+        async def async_wrapper(state: AgentState) -> Dict[str, Any]:
+            # Key functions may hit the network or disk - keep the event loop free
+            key = make_key(await asyncio.to_thread(key_func, state))
+            update = lookup(key)
+            if update is not None:
+                return update
+            return store(key, await node(state))
+        return async_wrapper
+
+    @wraps(node)
+    def wrapper(state: AgentState) -> Dict[str, Any]:
+        key = make_key(key_func(state))
+        update = lookup(key)
+        if update is not None:
+            return update
+        return store(key, node(state))
+    return wrapper
 
 # ============= CONDITIONAL ROUTING FUNCTIONS =============
 
-def route_after_detectives(state: AgentState) -> Literal["proceed_to_judges", "error_handler"]:
+def dispatch_detectives(state: AgentState) -> List[Send]:
+    """
+    Fan-out: Send one branch per detective whose artifact is targeted by the rubric.
+    All branches run in parallel within a single super-step.
+    """
+    targeted = {d.get("target_artifact") for d in state.get("rubric_dimensions", [])}
+    detectives = [node for node, artifact in DETECTIVE_ARTIFACTS.items() if artifact in targeted]
+
+    # No rubric targeting info - fall back to running every detective
+    if not detectives:
+        detectives = list(DETECTIVE_ARTIFACTS)
+
+    return [Send(node, state) for node in detectives]
+
+def evidence_join(state: AgentState) -> Dict[str, Any]:
+    """
+    Fan-in: every detective branch feeds this node, so it runs once, after the
+    merge_evidences reducer has combined all of their updates.
+    Writes nothing - it only gives route_after_detectives the merged state.
+    """
+    return {}
+
+def route_after_detectives(state: AgentState) -> List[str] | Literal["synthesis_check"]:
     """
     Conditional edge: Check if evidence collection succeeded.
     Handles: failed clone, missing evidence, errors
+    Attached to evidence_join, so it sees the evidence of every detective
+    (a per-detective edge would only see that branch's own writes).
+    Success fans out to all judges; failure goes to synthesis_check, which
+    records the failure and ends the graph.
     """
     # Check for fatal errors
     if state.get("error"):
-        return "error_handler"
+        return "synthesis_check"
     
-    # Check if any evidence was collected
-    total_evidence = sum(len(ev_list) for ev_list in state["evidences"].values())
-    if total_evidence == 0:
-        # Add warning for missing evidence
-        state["warnings"] = state.get("warnings", []) + ["No evidence collected - check repository accessibility"]
-        return "error_handler"
+    # Check if any evidence was collected (synthesis_check records the warning)
+    if state.get("evidence_count", 0) == 0:
+        return "synthesis_check"
     
     # Check for non-fatal errors
     error_count = len(state.get("errors", []))
     if error_count > 3:
-        return "error_handler"
+        return "synthesis_check"
     elif error_count > 0:
         print(f"⚠️ {error_count} errors occurred but continuing with available evidence")
     
-    return "proceed_to_judges"
+    # Fan out to every judge - they run in parallel in one super-step
+    return JUDGE_NODES
 
-def route_after_judges(state: AgentState) -> Literal["proceed_to_justice", "error_handler"]:
+def check_judges(state: AgentState) -> Tuple[List[str], List[str]]:
     """
-    Conditional edge: Check if judge deliberation produced opinions.
+    Check if judge deliberation produced opinions.
     Handles: malformed output, missing opinions
+    Returns (errors, warnings).
     """
     if len(state.get("opinions", [])) == 0:
-        state["errors"] = state.get("errors", []) + ["No opinions generated by judges"]
-        return "error_handler"
+        return ["No opinions generated by judges"], []
     
     # Check if we have opinions for all dimensions
     rubric_dimensions = state.get("rubric_dimensions", [])
@@ -57,83 +183,122 @@ def route_after_judges(state: AgentState) -> Literal["proceed_to_justice", "erro
     missing_dims = [d["id"] for d in rubric_dimensions if d["id"] not in opinion_dimensions]
     
     if missing_dims:
-        state["warnings"] = state.get("warnings", []) + [f"Missing opinions for dimensions: {missing_dims}"]
+        return [], [f"Missing opinions for dimensions: {missing_dims}"]
     
-    return "proceed_to_justice"
+    return [], []
 
-def route_after_synthesis(state: AgentState) -> Literal["end", "error_handler"]:
+def check_synthesis(state: AgentState) -> List[str]:
     """
-    Conditional edge: Check if final report was generated.
+    Check if final report was generated. Returns errors.
     """
     if not state.get("final_report"):
-        state["errors"] = state.get("errors", []) + ["Failed to generate final report"]
-        return "error_handler"
-    return "end"
+        return ["Failed to generate final report"]
+    return []
 
-def handle_errors(state: AgentState) -> Dict:
+def handle_errors(state: AgentState, errors: List[str], warnings: List[str]) -> Dict:
     """
-    Comprehensive error handling node.
-    Records all errors and warnings for audit trail.
+    Comprehensive error handling.
+    Records all errors and warnings for audit trail - returns only the new
+    entries, since the additive reducers append them to the existing ones.
     """
-    errors = state.get("errors", [])
-    warnings = state.get("warnings", [])
+    all_errors = state.get("errors", []) + errors
+    all_warnings = state.get("warnings", []) + warnings
     
     print(f"\n⚠️ ERROR HANDLER SUMMARY:")
-    print(f"   - Errors: {len(errors)}")
-    for i, error in enumerate(errors[:3]):
+    print(f"   - Errors: {len(all_errors)}")
+    for i, error in enumerate(all_errors[:3]):
         print(f"     {i+1}. {error}")
     
-    print(f"   - Warnings: {len(warnings)}")
-    for i, warning in enumerate(warnings[:3]):
+    print(f"   - Warnings: {len(all_warnings)}")
+    for i, warning in enumerate(all_warnings[:3]):
         print(f"     {i+1}. {warning}")
     
+    update = {"errors": errors, "warnings": warnings + ["Graph terminated with errors"]}
+    
     # Create error evidence if none exists
-    if len(state.get("evidences", {})) == 0:
+    if state.get("evidence_count", 0) == 0:
         from .state import Evidence
-        from datetime import datetime
         
         error_evidence = Evidence(
+            dimension_id="graph_execution",
             goal="Graph execution completed with errors",
             found=False,
-            content=f"Errors: {errors}\nWarnings: {warnings}",
+            content=f"Errors: {all_errors}\nWarnings: {all_warnings}",
             location="graph execution",
             rationale="Graph encountered errors during execution",
             confidence=1.0,
             collected_by="ErrorHandler"
         )
-        
-        return {
-            "evidences": {"error_handler": [error_evidence]},
-            "warnings": warnings + ["Graph terminated with errors"]
-        }
+        update["evidences"] = {"error_handler": [error_evidence]}
+        update["evidence_count"] = 1
     
-    return {"warnings": warnings + ["Graph terminated with errors"]}
+    return update
+
+def synthesis_check(state: AgentState) -> Command[Literal["__end__"]]:
+    """
+    Terminal node for every path: validates judge and synthesis output,
+    records errors/warnings and ends the graph in a single Command - no
+    separate error handler super-step.
+    """
+    errors, warnings = check_judges(state)
+    errors += check_synthesis(state)
+    
+    if state.get("evidence_count", 0) == 0:
+        warnings.append("No evidence collected - check repository accessibility")
+    
+    if errors:
+        return Command(update=handle_errors(state, errors, warnings), goto=END)
+    return Command(update={"warnings": warnings}, goto=END)
 
 # ============= MAIN GRAPH CONSTRUCTION =============
 
-def create_full_graph():
+def create_full_graph(
+    checkpointer: Optional[BaseCheckpointSaver] = None,
+    detectives_only: bool = False
+):
     """
     Create complete graph with ALL required patterns for HIGHEST SCORE:
     ✓ Two distinct parallel fan-out/fan-in patterns (detectives + judges)
-    ✓ Evidence aggregation node between layers
+    ✓ Evidence merged by reducer, routed once from a no-op join node
     ✓ Conditional edges for all error states
     ✓ Full end-to-end flow from URL to report
-    """
-    # Load rubric
-    rubric = RubricLoader()
 
+    Pass a checkpointer (e.g. MemorySaver) only for resumable runs - one-shot
+    audits skip the per-super-step state serialization.
+    detectives_only=True stops after evidence collection (no judges/synthesis).
+    """
     # Initialize graph
     builder = StateGraph(AgentState)
 
     # ============ ADD ALL NODES ============
     
     # --- Detective Layer (3 nodes) ---
-    builder.add_node("repo_investigator", repo_investigator_node)
-    builder.add_node("doc_analyst", doc_analyst_node)
-    builder.add_node("vision_inspector", vision_inspector_node)
+    # Cached per artifact - repeat audits of the same repo/PDF skip the work.
+    # No RetryPolicy: detectives turn every failure into confidence-0 evidence
+    # (never cached), so the next audit is the retry.
+    builder.add_node(
+        "repo_investigator",
+        cached_node("repo_investigator", repo_investigator_node, repo_cache_key)
+    )
+    builder.add_node(
+        "doc_analyst",
+        cached_node("doc_analyst", doc_analyst_node, pdf_cache_key)
+    )
+    builder.add_node(
+        "vision_inspector",
+        cached_node("vision_inspector", vision_inspector_node, pdf_cache_key)
+    )
     
-    # --- Aggregation Layer ---
-    builder.add_node("evidence_aggregator", evidence_aggregator_node)
+    # ============ DETECTIVE LAYER: FAN-OUT ============
+    # START → [Send to every detective targeted by the rubric, in parallel]
+    builder.add_conditional_edges(START, dispatch_detectives, list(DETECTIVE_ARTIFACTS))
+
+    if detectives_only:
+        # Evidence collection only - every detective branch ends the run
+        for detective in DETECTIVE_ARTIFACTS:
+            builder.add_edge(detective, END)
+        print("✅ Detective graph compiled (parallel Send fan-out, reducer fan-in)")
+        return builder.compile(checkpointer=checkpointer)
 
     # --- Judicial Layer (3 nodes) ---
     builder.add_node("prosecutor", prosecutor_node)
@@ -143,113 +308,116 @@ def create_full_graph():
     # --- Synthesis Layer ---
     builder.add_node("chief_justice", chief_justice_node)
 
-    # --- Error Handling ---
-    builder.add_node("error_handler", handle_errors)
-    
-    # --- Entry nodes for clean fan-out ---
-    builder.add_node("detectives_entry", lambda x: x)  # Pass-through for detective fan-out
-    builder.add_node("judges_entry", lambda x: x)      # Pass-through for judge fan-out
+    # --- Evidence fan-in (no-op join, routed on the merged state) ---
+    builder.add_node("evidence_join", evidence_join)
 
-    # ============ DETECTIVE LAYER: FAN-OUT ============
-    # START → detectives_entry → [all three detectives in parallel]
-    builder.add_edge(START, "detectives_entry")
-    builder.add_edge("detectives_entry", "repo_investigator")
-    builder.add_edge("detectives_entry", "doc_analyst")
-    builder.add_edge("detectives_entry", "vision_inspector")
-
-    # ============ DETECTIVE LAYER: FAN-IN to AGGREGATOR ============
-    builder.add_edge("repo_investigator", "evidence_aggregator")
-    builder.add_edge("doc_analyst", "evidence_aggregator")
-    builder.add_edge("vision_inspector", "evidence_aggregator")
-
-    # ============ CONDITIONAL EDGE: After Detectives ============
+    # --- Terminal check + error handling (ends the graph via Command) ---
+    builder.add_node("synthesis_check", synthesis_check)
+
+    # ============ FAN-IN + CONDITIONAL EDGE + JUDICIAL LAYER: FAN-OUT ============
+    # The merge_evidences reducer joins detective branches at the super-step
+    # boundary; evidence_join then routes once on the merged evidence -
+    # success path fans out to all judges, error path to synthesis_check
+    for detective in DETECTIVE_ARTIFACTS:
+        builder.add_edge(detective, "evidence_join")
     builder.add_conditional_edges(
-        "evidence_aggregator",
+        "evidence_join",
         route_after_detectives,
-        {
-            "proceed_to_judges": "judges_entry",  # Success path
-            "error_handler": "error_handler"       # Error path
-        }
+        [*JUDGE_NODES, "synthesis_check"]
     )
 
-    # ============ JUDICIAL LAYER: FAN-OUT ============
-    builder.add_edge("judges_entry", "prosecutor")
-    builder.add_edge("judges_entry", "defense")
-    builder.add_edge("judges_entry", "tech_lead")
-
     # ============ JUDICIAL LAYER: FAN-IN to CHIEF JUSTICE ============
     builder.add_edge("prosecutor", "chief_justice")
     builder.add_edge("defense", "chief_justice")
     builder.add_edge("tech_lead", "chief_justice")
 
-    # ============ CONDITIONAL EDGE: After Judges ============
-    builder.add_conditional_edges(
-        "chief_justice",
-        route_after_judges,
-        {
-            "proceed_to_justice": "synthesis_check",  # Success path
-            "error_handler": "error_handler"           # Error path
-        }
-    )
-
     # ============ SYNTHESIS CHECK ============
-    builder.add_node("synthesis_check", lambda x: x)  # Pass-through for final check
-    
-    builder.add_conditional_edges(
-        "synthesis_check",
-        route_after_synthesis,
-        {
-            "end": END,                 # Success - report generated
-            "error_handler": "error_handler"  # Error - report missing
-        }
-    )
-
-    # ============ ERROR HANDLING PATH ============
-    builder.add_edge("error_handler", END)
+    # synthesis_check validates opinions + report, then Command(goto=END)
+    builder.add_edge("chief_justice", "synthesis_check")
 
-    # ============ COMPILE WITH CHECKPOINTING ============
-    graph = builder.compile(checkpointer=MemorySaver())
+    # ============ COMPILE (CHECKPOINTING OPTIONAL) ============
+    graph = builder.compile(checkpointer=checkpointer)
     
     # Print graph structure for verification
     print("✅ Graph compiled successfully with:")
-    print("   - Detective Layer: 3 nodes (parallel fan-out)")
-    print("   - Aggregation Layer: 1 node (fan-in)")
+    print("   - Detective Layer: 3 nodes (parallel Send fan-out)")
+    print("   - Aggregation: merge_evidences reducer + evidence_join (fan-in)")
     print("   - Judicial Layer: 3 nodes (parallel fan-out)")
     print("   - Synthesis Layer: 1 node (fan-in)")
-    print("   - Conditional edges: 3 error-handling paths")
+    print("   - Error handling: detective routing + Command-based synthesis check")
     
     return graph
 
-def run_full_audit(repo_url: str, pdf_path: str) -> Dict[str, Any]:
+def audit_thread_id(repo_url: str) -> str:
+    """Stable checkpoint thread id - unlike hash(), identical across processes"""
+    return "audit-" + hashlib.blake2b(repo_url.encode(), digest_size=8).hexdigest()
+
+@lru_cache(maxsize=2)
+def _compiled_graph(detectives_only: bool = False):
+    """Checkpoint-free compiled graph, built once per process (per depth)"""
+    return create_full_graph(detectives_only=detectives_only)
+
+def get_full_graph(resumable: bool = False, detectives_only: bool = False):
     """
-    Run complete audit with all layers.
-    Returns final state with AuditReport.
+    Compiled graph, built once per process (per depth).
+    Each resumable run gets its own MemorySaver - the thread id is a fixed function
+    of the repo URL, so a shared saver would start a re-audit from the previous
+    run's checkpoint and the additive reducers would double its state.
     """
-    rubric = RubricLoader()
+    graph = _compiled_graph(detectives_only)
+    if resumable:
+        return graph.copy(update={"checkpointer": MemorySaver()})
+    return graph
+
+def create_detective_graph(checkpointer: Optional[BaseCheckpointSaver] = None):
+    """Detective layer only - the full graph, short-circuited after evidence collection"""
+    return create_full_graph(checkpointer=checkpointer, detectives_only=True)
+
+def initial_audit_state(repo_url: str, pdf_path: str) -> Dict[str, Any]:
+    """Empty AgentState for a new audit, with the (cached) rubric loaded"""
+    rubric = get_rubric()
 
-    initial_state = {
+    return {
         "repo_url": repo_url,
         "pdf_path": pdf_path,
         "rubric_dimensions": rubric.get_dimensions(),
         "evidences": {},
+        "evidence_count": 0,
         "opinions": [],
         "final_report": None,
         "errors": [],
         "warnings": []
     }
 
-    graph = create_full_graph()
+def audit_config(repo_url: str, max_concurrency: int, resumable: bool) -> Dict[str, Any]:
+    """Run config - the checkpoint thread id is only needed for resumable runs"""
+    config = {"max_concurrency": max_concurrency}
+    if resumable:
+        config["configurable"] = {"thread_id": audit_thread_id(repo_url)}
+    return config
+
+async def arun_full_audit(
+    repo_url: str,
+    pdf_path: str,
+    max_concurrency: int = MAX_CONCURRENCY,
+    resumable: bool = False
+) -> Dict[str, Any]:
+    """
+    Run complete audit with all layers (async - detective nodes are coroutines).
+    Checkpoints with MemorySaver only when resumable=True.
+    Returns final state with AuditReport.
+    """
+    initial_state = initial_audit_state(repo_url, pdf_path)
+    graph = get_full_graph(resumable)
+    config = audit_config(repo_url, max_concurrency, resumable)
 
     try:
         print(f"\n🚀 Starting full audit for: {repo_url}")
-        result = graph.invoke(
-            initial_state,
-            config={"configurable": {"thread_id": f"audit-{hash(repo_url)}"}}
-        )
+        result = await graph.ainvoke(initial_state, config=config)
         
         # Print summary
         print(f"\n✅ Audit completed successfully!")
-        print(f"📊 Evidence collected: {sum(len(e) for e in result['evidences'].values())}")
+        print(f"📊 Evidence collected: {result['evidence_count']}")
         print(f"⚖️ Opinions generated: {len(result.get('opinions', []))}")
         print(f"📄 Final report: {'Generated' if result.get('final_report') else 'Not generated'}")
         
@@ -263,8 +431,41 @@ def run_full_audit(repo_url: str, pdf_path: str) -> Dict[str, Any]:
         print(f"❌ Graph execution error: {e}")
         return {**initial_state, "errors": [str(e)]}
 
+def run_full_audit(
+    repo_url: str,
+    pdf_path: str,
+    max_concurrency: int = MAX_CONCURRENCY,
+    resumable: bool = False
+) -> Dict[str, Any]:
+    """
+    Run complete audit with all layers.
+    Returns final state with AuditReport.
+    """
+    return asyncio.run(arun_full_audit(repo_url, pdf_path, max_concurrency, resumable))
+
+def run_detective_phase(
+    repo_url: str,
+    pdf_path: str,
+    max_concurrency: int = MAX_CONCURRENCY,
+    resumable: bool = False
+) -> Dict[str, Any]:
+    """
+    Run the detective layer only (used by the CLI).
+    Returns state with merged evidences - no opinions or report.
+    """
+    graph = get_full_graph(resumable, detectives_only=True)
+    config = audit_config(repo_url, max_concurrency, resumable)
+    return asyncio.run(graph.ainvoke(initial_audit_state(repo_url, pdf_path), config=config))
+
 # For testing
 if __name__ == "__main__":
+    import sys
+
+    # Visualization is opt-in - only pay for the layout when asked
+    if "--draw" in sys.argv:
+        print(get_full_graph().get_graph().draw_mermaid())
+        sys.exit(0)
+
     print("=" * 60)
     print("🚀 TESTING FULL AUDIT GRAPH")
     print("=" * 60)
@@ -1,208 +1,216 @@
 """Detective nodes that produce structured Evidence objects - pure facts, no opinions"""
 
-import json
+import asyncio
 from typing import Dict, Any, List
 from datetime import datetime
 
 from ..state import AgentState, Evidence
 from ..tools.repo_tools import RepoInvestigator
 from ..tools.doc_tools import DocAnalyst
-from ..rubric_loader import RubricLoader
+from ..rubric_loader import get_rubric
 from .vision_inspector import vision_inspector_node
 
-def repo_investigator_node(state: AgentState) -> Dict[str, List[Evidence]]:
+def _as_analysis(result: Any) -> Dict[str, Any]:
+    """Turn an exception returned by asyncio.gather into a failed analysis dict"""
+    if isinstance(result, BaseException):
+        return {"error": str(result), "failed": True}
+    return result
+
+def _confidence(analysis: Dict[str, Any], confidence: float) -> float:
+    """Evidence from a failed analysis gets confidence 0 - failure evidence is never cached"""
+    return 0.0 if analysis.get("failed") else confidence
+
+def _mk_evidence(collector: str, dimension_id: str, goal: str, location: str,
+                 found: bool, content: Any, rationale: str, confidence: float) -> Evidence:
+    """
+    Build one Evidence - the shared shape of every detective finding.
+    Every field comes from our own typed analysis code, so validation is skipped.
+    """
+    return Evidence.model_construct(
+        dimension_id=dimension_id,
+        goal=goal,
+        found=found,
+        content=content,
+        location=location,
+        rationale=rationale,
+        confidence=confidence,
+        collected_by=collector
+    )
+
+async def repo_investigator_node(state: AgentState) -> Dict[str, List[Evidence]]:
     """
     LangGraph node that collects evidence from GitHub repository.
     Returns structured Evidence objects - pure facts, no opinions.
+    The clone and the four independent analyses run on worker threads,
+    so the other detectives keep running while git is busy.
     """
     evidences = []
 
     try:
         # Load rubric to know what to look for
-        rubric = RubricLoader()
+        rubric = get_rubric()
         repo_dimensions = rubric.get_dimensions_by_artifact("github_repo")
 
-        # Use context manager for automatic cleanup
-        with RepoInvestigator(state["repo_url"]) as investigator:
-
-            # After analyzing git history
-            git_history = investigator.analyze_git_history()
-            evidences.append(Evidence(
-                dimension_id="git_forensic_analysis",
-                goal="Git commit history shows progression (setup → tools → graph)",
-                found=git_history.get("progression_pattern") == "setup_to_tools_to_graph",
-                content=json.dumps({
-                    "total_commits": git_history.get("total_commits", 0),
-                    "progression_pattern": git_history.get("progression_pattern", "unknown"),
+        # Async context manager - clone and cleanup never block the event loop
+        async with RepoInvestigator(state["repo_url"]) as investigator:
+
+            # Run all analyses concurrently - a failed one becomes an error dict
+            results = await asyncio.gather(
+                asyncio.to_thread(investigator.analyze_git_history),
+                asyncio.to_thread(investigator.analyze_graph_structure),
+                asyncio.to_thread(investigator.check_state_models),
+                asyncio.to_thread(investigator.check_sandboxing),
+                return_exceptions=True
+            )
+            git_history, graph_analysis, state_analysis, sandbox_analysis = map(_as_analysis, results)
+
+        pattern = git_history.get("progression_pattern", "unknown")
+        total_commits = git_history.get("total_commits", 0)
+        truncated = git_history.get("history_truncated", False)
+        # A shallow clone only sees the newest CLONE_DEPTH commits - say so to the judges
+        commit_note = (f"{total_commits}+ commits (shallow clone, older history not fetched)"
+                       if truncated else f"{total_commits} commits")
+        progression = pattern == "setup_to_tools_to_graph"
+        parallel = graph_analysis.get("has_parallel", False)
+        reducers = graph_analysis.get("has_reducers", False)
+
+        evidences = [
+            # Git history
+            _mk_evidence(
+                "RepoInvestigator", "git_forensic_analysis",
+                "Git commit history shows progression (setup → tools → graph)", "git log",
+                found=progression,
+                content={
+                    "total_commits": total_commits,
+                    "history_truncated": truncated,
+                    "progression_pattern": pattern,
                     "bulk_upload_detected": git_history.get("bulk_upload_detected", False),
                     "recent_commits": git_history.get("commits", [])[:3]
-                }, indent=2),
-                location="git log",
-                rationale=f"Found {git_history.get('total_commits', 0)} commits. Pattern: {git_history.get('progression_pattern', 'unknown')}",
-                confidence=0.95 if git_history.get("progression_pattern") == "setup_to_tools_to_graph" else 0.5, 
-                collected_by="RepoInvestigator"
-            ))
-
-            # After analyzing graph structure
-            graph_analysis = investigator.analyze_graph_structure()
-            evidences.append(Evidence(
-                dimension_id="graph_orchestration",
-                goal="Graph has parallel fan-out/fan-in architecture with reducers",
-                found=graph_analysis.get("has_parallel", False) and graph_analysis.get("has_reducers", False),   
-                content=json.dumps({
-                    "has_parallel": graph_analysis.get("has_parallel", False),
+                },
+                rationale=f"Found {commit_note}. Pattern: {pattern}",
+                confidence=_confidence(git_history, 0.95 if progression else 0.5)
+            ),
+            # Graph structure
+            _mk_evidence(
+                "RepoInvestigator", "graph_orchestration",
+                "Graph has parallel fan-out/fan-in architecture with reducers", "src/graph.py",
+                found=parallel and reducers,
+                content={
+                    "has_parallel": parallel,
                     "has_fan_out": graph_analysis.get("has_fan_out", False),
                     "has_fan_in": graph_analysis.get("has_fan_in", False),
-                    "has_reducers": graph_analysis.get("has_reducers", False),
+                    "has_reducers": reducers,
                     "reducers_found": graph_analysis.get("state_reducers", []),
                     "nodes": graph_analysis.get("nodes", []),
                     "conditional_edges": graph_analysis.get("conditional_edges", [])
-                }, indent=2),
-                location="src/graph.py",
-                rationale=f"Parallel: {graph_analysis.get('has_parallel', False)}, Reducers: {graph_analysis.get('has_reducers', False)}",
-                confidence=0.95 if graph_analysis.get("has_parallel") and graph_analysis.get("has_reducers") else 0.3,
-                collected_by="RepoInvestigator"
-            ))
-
-            # Check state models
-            state_analysis = investigator.check_state_models()
-            evidences.append(Evidence(
-                dimension_id="state_management_rigor",
-                goal="State uses Pydantic with reducers",
-                found=state_analysis.get("has_reducers", False) and state_analysis.get("has_evidence", False),   
-                content=json.dumps(state_analysis, indent=2),
-                location="src/state.py",
+                },
+                rationale=f"Parallel: {parallel}, Reducers: {reducers}",
+                confidence=_confidence(graph_analysis, 0.95 if parallel and reducers else 0.3)
+            ),
+            # State models
+            _mk_evidence(
+                "RepoInvestigator", "state_management_rigor",
+                "State uses Pydantic with reducers", "src/state.py",
+                found=state_analysis.get("has_reducers", False) and state_analysis.get("has_evidence", False),
+                content=state_analysis,
                 rationale=f"Reducers: {state_analysis.get('has_reducers', False)}. Evidence class: {state_analysis.get('has_evidence', False)}",
-                confidence=0.95 if state_analysis.get("has_reducers") else 0.3,
-                collected_by="RepoInvestigator"
-            ))
-
-            # Check sandboxing
-            sandbox_analysis = investigator.check_sandboxing()
-            evidences.append(Evidence(
-                dimension_id="safe_tool_engineering",  # ADDED
-                goal="Tools use proper sandboxing (tempfile, no os.system)",
+                confidence=_confidence(state_analysis, 0.95 if state_analysis.get("has_reducers") else 0.3)
+            ),
+            # Sandboxing
+            _mk_evidence(
+                "RepoInvestigator", "safe_tool_engineering",
+                "Tools use proper sandboxing (tempfile, no os.system)", "src/tools/",
                 found=sandbox_analysis.get("has_tempfile", False) and sandbox_analysis.get("no_os_system", True),
-                content=json.dumps(sandbox_analysis, indent=2),
-                location="src/tools/",
+                content=sandbox_analysis,
                 rationale=f"Tempfile: {sandbox_analysis.get('has_tempfile', False)}. No os.system: {sandbox_analysis.get('no_os_system', True)}",
-                confidence=0.9 if sandbox_analysis.get("has_tempfile") else 0.2,
-                collected_by="RepoInvestigator"
-            ))
+                confidence=_confidence(sandbox_analysis, 0.9 if sandbox_analysis.get("has_tempfile") else 0.2)
+            ),
+        ]
 
     except Exception as e:
         # Graceful error handling - still return evidence
-        evidences.append(Evidence(
-            dimension_id="git_forensic_analysis",  # ADDED
-            goal="Clone and analyze repository successfully",
+        evidences.append(_mk_evidence(
+            "RepoInvestigator", "git_forensic_analysis",
+            "Clone and analyze repository successfully", state["repo_url"],
             found=False,
             content=str(e),
-            location=state["repo_url"],
             rationale=f"Error during investigation: {str(e)}",
-            confidence=0.0,
-            collected_by="RepoInvestigator"
+            confidence=0.0
         ))
 
-    return {"evidences": {"repo": evidences}}
+    return {"evidences": {"repo": evidences}, "evidence_count": len(evidences)}
 
-def doc_analyst_node(state: AgentState) -> Dict[str, List[Evidence]]:
+async def doc_analyst_node(state: AgentState) -> Dict[str, List[Evidence]]:
     """
     LangGraph node that collects evidence from PDF report.
     Returns structured Evidence objects - pure facts, no opinions.
+    The PDF is parsed once; all queries then run concurrently on worker threads.
     """
     evidences = []
 
     try:
         analyst = DocAnalyst(state["pdf_path"])
 
-        # Extract text and create chunks
-        analyst.extract_text()
-        analyst.chunk_text()
+        # Extract text and create chunks once (per PDF per process) - every query below reuses them
+        await asyncio.to_thread(analyst.build_index)
 
-        # Check for deep concept explanations
+        # Concept checks, file path extraction and diagram lookup are independent
         concepts = ["Dialectical Synthesis", "Fan-In", "Fan-Out", "Metacognition", "State Synchronization"]      
-        for concept in concepts:
-            analysis = analyst.check_concept_depth(concept)
-            evidences.append(Evidence(
-                dimension_id="theoretical_depth",  # ADDED
-                goal=f"PDF explains '{concept}' in depth (not just keyword dropping)",
+        analyses, file_paths, diagram_mentions = await asyncio.gather(
+            asyncio.to_thread(analyst.check_concepts_batch, concepts),  # one pass for all concepts
+            asyncio.to_thread(analyst.extract_file_paths),
+            asyncio.to_thread(analyst.query_concept, "diagram")
+        )
+
+        # Check for deep concept explanations
+        for concept, analysis in analyses.items():
+            evidences.append(_mk_evidence(
+                "DocAnalyst", "theoretical_depth",
+                f"PDF explains '{concept}' in depth (not just keyword dropping)", f"PDF: {concept} section",
                 found=analysis["depth"] == "deep",
-                content=json.dumps({
+                content={
                     "depth": analysis["depth"],
-                    "explanation_preview": analysis["explanations"][0] if analysis["explanations"] else None     
-                }, indent=2),
-                location=f"PDF: {concept} section",
+                    "explanation_preview": analysis["explanations"][0] if analysis["explanations"] else None
+                },
                 rationale=f"Depth: {analysis['depth']}. {'Found explanation' if analysis['explanations'] else 'Keyword only'}",
-                confidence=0.9 if analysis["depth"] == "deep" else 0.4 if analysis["depth"] == "moderate" else 0.1,
-                collected_by="DocAnalyst"
+                confidence=0.9 if analysis["depth"] == "deep" else 0.4 if analysis["depth"] == "moderate" else 0.1
             ))
 
         # Extract file paths for cross-reference
-        file_paths = analyst.extract_file_paths()
-        evidences.append(Evidence(
-            dimension_id="report_accuracy",  # ADDED
-            goal="PDF mentions specific file paths that can be cross-referenced",
+        evidences.append(_mk_evidence(
+            "DocAnalyst", "report_accuracy",
+            "PDF mentions specific file paths that can be cross-referenced", "PDF file paths",
             found=len(file_paths) > 0,
-            content=json.dumps(file_paths[:10], indent=2),  # First 10 paths
-            location="PDF file paths",
+            content=file_paths[:10],  # First 10 paths
             rationale=f"Found {len(file_paths)} file paths in PDF",
-            confidence=0.8 if len(file_paths) > 0 else 0.1,
-            collected_by="DocAnalyst"
+            confidence=0.8 if len(file_paths) > 0 else 0.1
         ))
 
         # Check for architecture diagram mentions
-        diagram_mentions = analyst.query_concept("diagram")
-        evidences.append(Evidence(
-            dimension_id="swarm_visual",  # ADDED
-            goal="PDF includes architecture diagrams",
+        evidences.append(_mk_evidence(
+            "DocAnalyst", "swarm_visual",
+            "PDF includes architecture diagrams", "PDF diagrams section",
             found=len(diagram_mentions) > 0,
-            content=json.dumps([m["text"][:100] for m in diagram_mentions[:2]], indent=2),
-            location="PDF diagrams section",
+            content=[m["text"][:100] for m in diagram_mentions[:2]],
             rationale=f"Found {len(diagram_mentions)} mentions of diagrams",
-            confidence=0.7 if len(diagram_mentions) > 0 else 0.1,
-            collected_by="DocAnalyst"
+            confidence=0.7 if len(diagram_mentions) > 0 else 0.1
         ))
 
     except FileNotFoundError as e:
-        evidences.append(Evidence(
-            dimension_id="theoretical_depth",  # ADDED
-            goal="Access PDF file",
+        evidences.append(_mk_evidence(
+            "DocAnalyst", "theoretical_depth", "Access PDF file", state["pdf_path"],
             found=False,
             content=str(e),
-            location=state["pdf_path"],
             rationale=f"PDF file not found: {str(e)}",
-            confidence=0.0,
-            collected_by="DocAnalyst"
+            confidence=0.0
         ))
     except Exception as e:
-        evidences.append(Evidence(
-            dimension_id="theoretical_depth",  # ADDED
-            goal="Parse PDF successfully",
+        evidences.append(_mk_evidence(
+            "DocAnalyst", "theoretical_depth", "Parse PDF successfully", state["pdf_path"],
             found=False,
             content=str(e),
-            location=state["pdf_path"],
             rationale=f"Error parsing PDF: {str(e)}",
-            confidence=0.0,
-            collected_by="DocAnalyst"
+            confidence=0.0
         ))
 
-    return {"evidences": {"doc": evidences}}
-
-def evidence_aggregator_node(state: AgentState) -> Dict:
-    """
-    Synchronization node that collects evidence from all detectives.
-    This node enables fan-in pattern - waits for all parallel detectives to complete.
-    """
-    # Count evidence by source
-    evidence_summary = {}
-    for source, ev_list in state["evidences"].items():
-        evidence_summary[source] = len(ev_list)
-
-    total_evidence = sum(len(ev_list) for ev_list in state["evidences"].values())
-
-    print(f"\n📊 Evidence Aggregator: Collected {total_evidence} evidence items")
-    for source, count in evidence_summary.items():
-        print(f"   - {source}: {count} items")
-
-    # No state changes - just a synchronization point
-    return {}
\ No newline at end of file
+    return {"evidences": {"doc": evidences}, "evidence_count": len(evidences)}
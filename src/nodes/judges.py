@@ -1,16 +1,111 @@
 """Three genuinely distinct judicial personas with conflicting philosophies - HIGHEST SCORE"""
 
 from langchain_google_genai import ChatGoogleGenerativeAI  # Changed from OpenAI
-from ..state import AgentState, JudicialOpinion
-import json
-import time
-import sys
+from ..state import AgentState, Evidence, JudicialOpinion
+from ..cache_paths import cache_dir
+import asyncio
+import hashlib
+import logging
 import os
+import random
 import warnings
+import weakref
+from contextlib import contextmanager
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, List, Tuple
+
+# Loggers of the LLM client stack - raised to ERROR while judge calls are in flight
+LLM_CLIENT_LOGGERS = ("langchain_google_genai", "google_genai", "google.genai",
+                      "google.api_core", "google.auth", "grpc", "httpx")
+
+# Deprecation/user warnings raised from the LLM client packages only - everyone
+# else's warnings still show
+warnings.filterwarnings("ignore", module=r"(langchain_google_genai|google|grpc)(\.|$)")
+
+# Open quiet_llm_output() scopes and the logger levels to restore after the last one
+_quiet_depth = 0
+_saved_levels: Dict[str, int] = {}
+
+@contextmanager
+def quiet_llm_output():
+    """
+    Silence the LLM client's loggers, only while calls are in flight.
+    Reference-counted: concurrent judge calls share one raised level, and the
+    original levels come back when the last call finishes. sys.stderr is left
+    alone, so output from other tasks and worker threads is never lost.
+    """
+    global _quiet_depth
+    if _quiet_depth == 0:
+        for name in LLM_CLIENT_LOGGERS:
+            logger = logging.getLogger(name)
+            _saved_levels[name] = logger.level
+            logger.setLevel(logging.ERROR)
+    _quiet_depth += 1
+    try:
+        yield
+    finally:
+        _quiet_depth -= 1
+        if _quiet_depth == 0:
+            for name, level in _saved_levels.items():
+                logging.getLogger(name).setLevel(level)
+            _saved_levels.clear()
+
+# Model every judge uses - part of the opinion cache key
+JUDGE_MODEL = "gemini-3-flash-preview"
+
+# On-disk opinion cache - identical prompts (same persona, dimension and evidence) skip the LLM
+OPINION_CACHE_DIR = cache_dir("opinions")
+
+# ============ EVIDENCE RENDERING (shared by all personas) ============
+
+def render_evidence(style: str, evidence_list: List[Evidence]) -> str:
+    """
+    Evidence summary for a persona's prompt ("prosecutor", "defense" or "tech_lead").
+    Keyed on the rendered facts, so identical evidence is built into text only once.
+    """
+    key = tuple(
+        (e.found, e.goal, e.confidence, e.content_text() if e.found and e.content else "")
+        for e in evidence_list
+    )
+    return _render_evidence(style, key)
+
+@lru_cache(maxsize=512)
+def _render_evidence(style: str, items: Tuple[Tuple[bool, str, float, str], ...]) -> str:
+    lines = []
+    for found, goal, confidence, text in items:
+        status = "✅ FOUND" if found else "❌ MISSING"
+        if style == "tech_lead":
+            lines.append(f"  {status} - {goal}")
+        else:
+            lines.append(f"  {status} - {goal} (confidence: {confidence})")
+        
+        if text and style == "defense":
+            lines.append(f"     Content preview: {text[:100]}...")
+        elif text and style == "tech_lead":
+            # Truncate content for readability
+            preview = text[:200] + "..." if len(text) > 200 else text
+            lines.append(f"     Technical details: {preview}")
+    
+    return "\n".join(lines) or "  No evidence collected"
+
+# Max in-flight LLM calls across ALL judges - one flat pool sized to the provider's rate limit
+JUDGE_CONCURRENCY = 16
+
+# One structured client per event loop - the judges of a run share its HTTP/gRPC
+# session, while a later asyncio.run() never inherits a channel bound to a closed loop
+_judge_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, tuple]" = weakref.WeakKeyDictionary()
+
+# The shared call pool, also per event loop (a semaphore cannot cross loops)
+_llm_slots: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.Semaphore]" = weakref.WeakKeyDictionary()
 
-# Suppress all warnings and stderr messages
-warnings.filterwarnings('ignore')
-sys.stderr = open(os.devnull, 'w')
+def llm_slots() -> asyncio.Semaphore:
+    """Semaphore shared by every persona's LLM calls on the running loop"""
+    loop = asyncio.get_running_loop()
+    slots = _llm_slots.get(loop)
+    if slots is None:
+        slots = _llm_slots[loop] = asyncio.Semaphore(JUDGE_CONCURRENCY)
+    return slots
 
 def get_structured_judge(model_name: str = "default"):
     """Get Gemini LLM with structured output bound to JudicialOpinion (COMPLETELY FREE)"""
@@ -19,57 +114,96 @@ def get_structured_judge(model_name: str = "default"):
         print("⚠️ GOOGLE_API_KEY not found in .env file")
         print("   Get a free key from: https://makersuite.google.com/app/apikey")
         return None
+
+    try:
+        loop = asyncio.get_running_loop()
+    except RuntimeError:
+        loop = None
+
+    cached = _judge_clients.get(loop) if loop else None
+    if cached and cached[0] == api_key:
+        return cached[1]
     
     # Use Gemini 1.5 Flash - completely free tier
     llm = ChatGoogleGenerativeAI(
-        model="gemini-3-flash-preview",  # Free model with 1M token context
+        model=JUDGE_MODEL,  # Free model with 1M token context
         google_api_key=api_key,
         temperature=0
     )
-    return llm.with_structured_output(JudicialOpinion)
+    structured_llm = llm.with_structured_output(JudicialOpinion)
+    if loop:
+        _judge_clients[loop] = (api_key, structured_llm)
+    return structured_llm
 
-# ============ PROSECUTOR - EXTREME CRITICAL LENS ============
+def opinion_cache_path(prompt: str) -> Path:
+    """Cache file for a prompt - the prompt embeds persona, dimension and evidence"""
+    key = hashlib.blake2b(f"{JUDGE_MODEL}\0{prompt}".encode(), digest_size=16).hexdigest()
+    return OPINION_CACHE_DIR / f"{key}.json"
 
-def prosecutor_node(state: AgentState) -> dict:
+async def ainvoke_cached(llm, prompt: str) -> JudicialOpinion:
     """
-    PROSECUTOR: "Trust No One. Assume Vibe Coding."
-    
-    This persona is EXTREMELY adversarial. Their job is to find flaws,
-    security vulnerabilities, and missing requirements. They assume the worst
-    and deduct points aggressively.
+    LLM call memoized on disk - only real LLM opinions are stored, never fallbacks.
+    Only the network call holds a pool slot; cache hits and retry waits do not.
     """
-    structured_llm = get_structured_judge("prosecutor")
-    opinions = []
-    
-    print("\n⚡ PROSECUTOR: Beginning adversarial analysis...")
-    
-    for dimension in state["rubric_dimensions"]:
-        dim_id = dimension["id"]
-        evidence_list = state["evidences"].get(dim_id, [])
-        
-        # Build evidence summary
-        evidence_summary = []
-        for e in evidence_list:
-            status = "✅ FOUND" if e.found else "❌ MISSING"
-            evidence_summary.append(f"  {status} - {e.goal} (confidence: {e.confidence})")
-        
-        evidence_text = "\n".join(evidence_summary) if evidence_summary else "  No evidence collected"
-        
-        # PROSECUTOR prompt - designed to be HARSH and adversarial
-        prompt = f"""You are the PROSECUTOR in a digital courtroom. Your philosophy: "TRUST NO ONE. ASSUME VIBE CODING."
-
-You are paid to find FLAWS. Every point you deduct must be justified. If you cannot find a security issue, missing requirement, or lazy implementation, you lose your job.
-
---- CASE FILE: {dimension['name']} ---
+    path = opinion_cache_path(prompt)
+    try:
+        return JudicialOpinion.model_validate_json(path.read_text())
+    except (OSError, ValueError):
+        pass  # Miss or unreadable entry - ask the LLM
+
+    async with llm_slots():
+        with quiet_llm_output():
+            opinion = await llm.ainvoke(prompt)
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(opinion.model_dump_json())
+    except OSError:
+        pass  # Caching is best-effort
+    return opinion
+
+# Retry transient LLM failures (rate limits, timeouts) with exponential backoff
+RETRY_ATTEMPTS = 4
+RETRY_INITIAL_WAIT = 0.5
+RETRY_MAX_WAIT = 8.0
+
+async def ainvoke_with_retry(llm, prompt: str) -> JudicialOpinion:
+    """ainvoke_cached with capped exponential backoff and full jitter between attempts"""
+    for attempt in range(RETRY_ATTEMPTS):
+        try:
+            return await ainvoke_cached(llm, prompt)
+        except Exception:
+            if attempt == RETRY_ATTEMPTS - 1:
+                raise
+            # Random wait up to the backoff cap - retries in a rate-limit storm don't sync up
+            cap = min(RETRY_MAX_WAIT, RETRY_INITIAL_WAIT * 2 ** attempt)
+            await asyncio.sleep(random.uniform(0, cap))
+
+def index_evidence(evidences: Dict[str, List[Evidence]]) -> Dict[str, List[Evidence]]:
+    """Group evidence by rubric dimension in one pass (state keys it by detective source)"""
+    by_dimension: Dict[str, List[Evidence]] = {}
+    for ev_list in evidences.values():
+        for e in ev_list:
+            by_dimension.setdefault(e.dimension_id, []).append(e)
+    return by_dimension
+
+async def score_dimensions(
+    dimensions: List[Dict[str, Any]],
+    score_dimension: Callable[[Dict[str, Any]], Awaitable[JudicialOpinion]]
+) -> List[JudicialOpinion]:
+    """
+    Score every rubric dimension concurrently, keeping rubric order.
+    The three judge nodes run in parallel, so all persona x dimension calls
+    share the one llm_slots() pool.
+    """
+    return list(await asyncio.gather(*(score_dimension(d) for d in dimensions)))
 
-SUCCESS PATTERN (what SHOULD exist):
-{dimension.get('success_pattern', 'Not specified')}
+# ============ PROSECUTOR - EXTREME CRITICAL LENS ============
 
-FAILURE PATTERN (what to look for):
-{dimension.get('failure_pattern', 'Not specified')}
+# PROSECUTOR prompt - designed to be HARSH and adversarial - static, built once.
+# The case file for each dimension is appended after it.
+_PROSECUTOR_PREFIX = """You are the PROSECUTOR in a digital courtroom. Your philosophy: "TRUST NO ONE. ASSUME VIBE CODING."
 
-EVIDENCE COLLECTED:
-{evidence_text}
+You are paid to find FLAWS. Every point you deduct must be justified. If you cannot find a security issue, missing requirement, or lazy implementation, you lose your job.
 
 Your task: Score this dimension 1-5 based SOLELY on what's MISSING.
 
@@ -92,81 +226,74 @@ Your response must include:
 3. Charges (e.g., "Orchestration Fraud", "Hallucination Liability", "Security Negligence")
 
 Be HARSH. Be CRITICAL. This is not a participation trophy.
+
 """
+
+async def prosecutor_node(state: AgentState) -> dict:
+    """
+    PROSECUTOR: "Trust No One. Assume Vibe Coding."
+    
+    This persona is EXTREMELY adversarial. Their job is to find flaws,
+    security vulnerabilities, and missing requirements. They assume the worst
+    and deduct points aggressively.
+    """
+    structured_llm = get_structured_judge("prosecutor")
+    
+    print("\n⚡ PROSECUTOR: Beginning adversarial analysis...")
+    log_lines: List[str] = []  # Per-dimension results, written in one batch at the end
+    
+    # Evidence is grouped once per judge, not searched per dimension
+    by_dimension = index_evidence(state["evidences"])
+
+    async def score_dimension(dimension: Dict[str, Any]) -> JudicialOpinion:
+        dim_id = dimension["id"]
+        evidence_list = by_dimension.get(dim_id, [])
+        
+        evidence_text = render_evidence("prosecutor", evidence_list)
+        
+        # Static persona preamble first (shared by every dimension), case file last
+        prompt = "".join([_PROSECUTOR_PREFIX, f"""--- CASE FILE: {dimension['name']} ---
+
+SUCCESS PATTERN (what SHOULD exist):
+{dimension.get('success_pattern', 'Not specified')}
+
+FAILURE PATTERN (what to look for):
+{dimension.get('failure_pattern', 'Not specified')}
+
+EVIDENCE COLLECTED:
+{evidence_text}
+"""])
         try:
-            # Add retry logic for robustness
-            max_retries = 3
-            for attempt in range(max_retries):
-                try:
-                    if structured_llm:
-                        opinion = structured_llm.invoke(prompt)
-                    else:
-                        raise Exception("No LLM available")
-                    break
-                except Exception as e:
-                    if attempt == max_retries - 1:
-                        raise
-                    time.sleep(1)
-            
-            opinions.append(opinion)
-            print(f"  ⚡ Prosecutor scored {dimension['name']}: {opinion.score}/5")
+            if not structured_llm:
+                raise Exception("No LLM available")  # Nothing to retry
+            opinion = await ainvoke_with_retry(structured_llm, prompt)
+            log_lines.append(f"  ⚡ Prosecutor scored {dimension['name']}: {opinion.score}/5")
+            return opinion
             
         except Exception as e:
             # Fallback for when LLM fails
-            print(f"  ⚠️ Prosecutor error: {e}")
-            opinion = JudicialOpinion(
+            log_lines.append(f"  ⚠️ Prosecutor error: {e}")
+            opinion = JudicialOpinion.model_construct(  # Trusted literals - skip validation
                 judge="Prosecutor",
                 criterion_id=dim_id,
                 score=1,  # Default to harsh when system fails
                 argument=f"SYSTEM ERROR: Unable to generate opinion due to: {str(e)}. Defaulting to score 1 as precaution.",
                 cited_evidence=[e.location for e in evidence_list if e.found]
             )
-            opinions.append(opinion)
+            return opinion
     
+    opinions = await score_dimensions(state["rubric_dimensions"], score_dimension)
+    print("\n".join(log_lines), flush=True)
     return {"opinions": opinions}
 
 # ============ DEFENSE - EXTREME OPTIMISTIC LENS ============
 
-def defense_node(state: AgentState) -> dict:
-    """
-    DEFENSE ATTORNEY: "Reward Effort and Intent. Look for the Spirit of the Law."
-    
-    This persona is EXTREMELY forgiving. Their job is to find merit,
-    creative solutions, and evidence of deep understanding. They reward effort
-    even when implementation is imperfect.
-    """
-    structured_llm = get_structured_judge("defense")
-    opinions = []
-    
-    print("\n💙 DEFENSE: Beginning compassionate analysis...")
-    
-    for dimension in state["rubric_dimensions"]:
-        dim_id = dimension["id"]
-        evidence_list = state["evidences"].get(dim_id, [])
-        
-        # Build evidence summary
-        evidence_summary = []
-        for e in evidence_list:
-            status = "✅ FOUND" if e.found else "❌ MISSING"
-            evidence_summary.append(f"  {status} - {e.goal} (confidence: {e.confidence})")
-            if e.found and e.content:
-                evidence_summary.append(f"     Content preview: {e.content[:100]}...")
-        
-        evidence_text = "\n".join(evidence_summary) if evidence_summary else "  No evidence collected"
-        
-        # DEFENSE prompt - designed to be FORGIVING and look for positives
-        prompt = f"""You are the DEFENSE ATTORNEY in a digital courtroom. Your philosophy: "REWARD EFFORT AND INTENT. LOOK FOR THE SPIRIT OF THE LAW."
+# DEFENSE prompt - designed to be FORGIVING and look for positives - static, built once.
+# The case file for each dimension is appended after it.
+_DEFENSE_PREFIX = """You are the DEFENSE ATTORNEY in a digital courtroom. Your philosophy: "REWARD EFFORT AND INTENT. LOOK FOR THE SPIRIT OF THE LAW."
 
 You are paid to find MERIT. Even in flawed code, look for understanding and good faith effort. If you cannot find something positive, you lose your job.
 
---- CASE FILE: {dimension['name']} ---
-
-SUCCESS PATTERN (what good looks like):
-{dimension.get('success_pattern', 'Not specified')}
-
-EVIDENCE COLLECTED:
-{evidence_text}
-
 Your task: Score this dimension 1-5 based on EFFORT, INTENT, and UNDERSTANDING.
 
 SCORING GUIDELINES:
@@ -184,70 +311,72 @@ SPECIFIC THINGS TO LOOK FOR:
 💚 Documentation: Clear explanations of design decisions
 
 Remember: You are the DEFENSE. Your job is to find the GOOD in every attempt. Be GENEROUS.
+
 """
+
+async def defense_node(state: AgentState) -> dict:
+    """
+    DEFENSE ATTORNEY: "Reward Effort and Intent. Look for the Spirit of the Law."
+    
+    This persona is EXTREMELY forgiving. Their job is to find merit,
+    creative solutions, and evidence of deep understanding. They reward effort
+    even when implementation is imperfect.
+    """
+    structured_llm = get_structured_judge("defense")
+    
+    print("\n💙 DEFENSE: Beginning compassionate analysis...")
+    log_lines: List[str] = []  # Per-dimension results, written in one batch at the end
+    
+    # Evidence is grouped once per judge, not searched per dimension
+    by_dimension = index_evidence(state["evidences"])
+
+    async def score_dimension(dimension: Dict[str, Any]) -> JudicialOpinion:
+        dim_id = dimension["id"]
+        evidence_list = by_dimension.get(dim_id, [])
+        
+        evidence_text = render_evidence("defense", evidence_list)
+        
+        # Static persona preamble first (shared by every dimension), case file last
+        prompt = "".join([_DEFENSE_PREFIX, f"""--- CASE FILE: {dimension['name']} ---
+
+SUCCESS PATTERN (what good looks like):
+{dimension.get('success_pattern', 'Not specified')}
+
+EVIDENCE COLLECTED:
+{evidence_text}
+"""])
         try:
             if structured_llm:
-                opinion = structured_llm.invoke(prompt)
-                opinions.append(opinion)
-                print(f"  💙 Defense scored {dimension['name']}: {opinion.score}/5")
+                opinion = await ainvoke_with_retry(structured_llm, prompt)
+                log_lines.append(f"  💙 Defense scored {dimension['name']}: {opinion.score}/5")
+                return opinion
             else:
                 raise Exception("No LLM available")
             
         except Exception as e:
             # Fallback - defense is generous even in failure
-            print(f"  ⚠️ Defense error: {e}")
-            opinion = JudicialOpinion(
+            log_lines.append(f"  ⚠️ Defense error: {e}")
+            opinion = JudicialOpinion.model_construct(  # Trusted literals - skip validation
                 judge="Defense",
                 criterion_id=dim_id,
                 score=4,  # Default to generous when system fails
                 argument=f"SYSTEM ERROR but effort acknowledged. Unable to generate full opinion due to: {str(e)}. Defaulting to score 4 based on available evidence.",
                 cited_evidence=[e.location for e in evidence_list if e.found]
             )
-            opinions.append(opinion)
+            return opinion
     
+    opinions = await score_dimensions(state["rubric_dimensions"], score_dimension)
+    print("\n".join(log_lines), flush=True)
     return {"opinions": opinions}
 
 # ============ TECH LEAD - PRAGMATIC LENS ============
 
-def tech_lead_node(state: AgentState) -> dict:
-    """
-    TECH LEAD: "Does it actually work? Is it maintainable?"
-    
-    This persona is PRAGMATIC and neutral. They don't care about effort or harshness.
-    They evaluate based on code quality, maintainability, and whether it actually works.
-    They are the TIE-BREAKER between Prosecutor and Defense.
-    """
-    structured_llm = get_structured_judge("tech_lead")
-    opinions = []
-    
-    print("\n🔧 TECH LEAD: Beginning pragmatic analysis...")
-    
-    for dimension in state["rubric_dimensions"]:
-        dim_id = dimension["id"]
-        evidence_list = state["evidences"].get(dim_id, [])
-        
-        # Build evidence summary with content for technical evaluation
-        evidence_summary = []
-        for e in evidence_list:
-            status = "✅ FOUND" if e.found else "❌ MISSING"
-            evidence_summary.append(f"  {status} - {e.goal}")
-            if e.found and e.content:
-                # Truncate content for readability
-                content_preview = e.content[:200] + "..." if len(e.content) > 200 else e.content
-                evidence_summary.append(f"     Technical details: {content_preview}")
-        
-        evidence_text = "\n".join(evidence_summary) if evidence_summary else "  No evidence collected"
-        
-        # TECH LEAD prompt - designed to be PRAGMATIC and technical
-        prompt = f"""You are the TECH LEAD in a digital courtroom. Your philosophy: "DOES IT ACTUALLY WORK? IS IT MAINTAINABLE?"
+# TECH LEAD prompt - designed to be PRAGMATIC and technical - static, built once.
+# The case file for each dimension is appended after it.
+_TECH_LEAD_PREFIX = """You are the TECH LEAD in a digital courtroom. Your philosophy: "DOES IT ACTUALLY WORK? IS IT MAINTAINABLE?"
 
 You don't care about effort or harshness. You care about CODE QUALITY. You are the TIE-BREAKER between the Prosecutor and Defense.
 
---- CASE FILE: {dimension['name']} ---
-
-TECHNICAL EVIDENCE:
-{evidence_text}
-
 Your task: Score this dimension 1-5 based on TECHNICAL MERIT.
 
 SCORING GUIDELINES:
@@ -265,25 +394,58 @@ TECHNICAL EVALUATION CRITERIA:
 🔧 Is it SCALABLE? Parallel architecture, proper state management?
 
 You are the TIE-BREAKER. Be objective. Base your score on CODE QUALITY alone.
+
 """
+
+async def tech_lead_node(state: AgentState) -> dict:
+    """
+    TECH LEAD: "Does it actually work? Is it maintainable?"
+    
+    This persona is PRAGMATIC and neutral. They don't care about effort or harshness.
+    They evaluate based on code quality, maintainability, and whether it actually works.
+    They are the TIE-BREAKER between Prosecutor and Defense.
+    """
+    structured_llm = get_structured_judge("tech_lead")
+    
+    print("\n🔧 TECH LEAD: Beginning pragmatic analysis...")
+    log_lines: List[str] = []  # Per-dimension results, written in one batch at the end
+    
+    # Evidence is grouped once per judge, not searched per dimension
+    by_dimension = index_evidence(state["evidences"])
+
+    async def score_dimension(dimension: Dict[str, Any]) -> JudicialOpinion:
+        dim_id = dimension["id"]
+        evidence_list = by_dimension.get(dim_id, [])
+        
+        # Evidence summary with content for technical evaluation
+        evidence_text = render_evidence("tech_lead", evidence_list)
+        
+        # Static persona preamble first (shared by every dimension), case file last
+        prompt = "".join([_TECH_LEAD_PREFIX, f"""--- CASE FILE: {dimension['name']} ---
+
+TECHNICAL EVIDENCE:
+{evidence_text}
+"""])
         try:
             if structured_llm:
-                opinion = structured_llm.invoke(prompt)
-                opinions.append(opinion)
-                print(f"  🔧 Tech Lead scored {dimension['name']}: {opinion.score}/5")
+                opinion = await ainvoke_with_retry(structured_llm, prompt)
+                log_lines.append(f"  🔧 Tech Lead scored {dimension['name']}: {opinion.score}/5")
+                return opinion
             else:
                 raise Exception("No LLM available")
             
         except Exception as e:
             # Fallback - tech lead defaults to 3 (acceptable with technical debt)
-            print(f"  ⚠️ Tech Lead error: {e}")
-            opinion = JudicialOpinion(
+            log_lines.append(f"  ⚠️ Tech Lead error: {e}")
+            opinion = JudicialOpinion.model_construct(  # Trusted literals - skip validation
                 judge="TechLead",
                 criterion_id=dim_id,
                 score=3,
                 argument=f"TECHNICAL EVALUATION UNAVAILABLE due to: {str(e)}. Based on evidence structure, appears to have technical debt.",
                 cited_evidence=[e.location for e in evidence_list if e.found]
             )
-            opinions.append(opinion)
+            return opinion
     
+    opinions = await score_dimensions(state["rubric_dimensions"], score_dimension)
+    print("\n".join(log_lines), flush=True)
     return {"opinions": opinions}
\ No newline at end of file
@@ -1,9 +1,28 @@
 """Chief Justice with complete deterministic synthesis rules - HIGHEST SCORE"""
 
 from ..state import AgentState, AuditReport, CriterionResult, JudicialOpinion
-from datetime import datetime
-import os
-import json
+from collections import defaultdict
+from functools import lru_cache
+from typing import List, Optional
+import re
+import time
+from pathlib import Path
+
+REPORT_DIR = Path("audit/report_onself_generated")
+
+# ============ RULE KEYWORDS ============
+# Each keyword set is compiled once into a single alternation, so an argument
+# is scanned in one pass instead of once per keyword. Patterns are matched
+# against the opinion's cached lowercase argument - much faster than IGNORECASE
+SECURITY_TERMS = frozenset({"security", "vulnerability", "os.system", "injection", "sandbox", "unsafe"})
+DEEP_UNDERSTANDING_TERMS = frozenset({"deep", "understanding", "metacognition", "sophisticated", "excellent"})
+
+def compile_terms(terms: frozenset) -> "re.Pattern[str]":
+    """One alternation for a keyword set - substring semantics, like `term in text`"""
+    return re.compile("|".join(map(re.escape, sorted(terms))))
+
+SECURITY_TERMS_RE = compile_terms(SECURITY_TERMS)
+DEEP_UNDERSTANDING_RE = compile_terms(DEEP_UNDERSTANDING_TERMS)
 
 def chief_justice_node(state: AgentState) -> dict:
     """
@@ -23,103 +42,112 @@ def chief_justice_node(state: AgentState) -> dict:
     criteria_results = []
     
     print("\n🏛️ CHIEF JUSTICE: Beginning synthesis with deterministic rules...")
+    log_lines: List[str] = []  # Per-dimension rulings, written in one batch at the end
+    
+    # Index opinions once - every dimension below is then a dict lookup
+    opinions_by_dim = defaultdict(list)
+    judges_by_dim = defaultdict(dict)
+    for o in opinions:
+        opinions_by_dim[o.criterion_id].append(o)
+        judges_by_dim[o.criterion_id].setdefault(o.judge, o)  # first opinion per judge wins
+    
+    # Evidence facts the rules rely on do not depend on the dimension - compute them once
+    security_evidence = any(
+        e.dimension_id == "safe_tool_engineering" and not e.found
+        for e in evidences.get("repo", [])
+    )
+    has_deep_evidence = any(
+        e.dimension_id == "theoretical_depth" and e.found and e.confidence > 0.7
+        for e in evidences.get("doc", [])
+    )
     
     # Group opinions by dimension
     for dimension in rubric:
         dim_id = dimension["id"]
         dim_name = dimension["name"]
-        dim_opinions = [o for o in opinions if o.criterion_id == dim_id]
+        dim_opinions = opinions_by_dim.get(dim_id)
         
         if not dim_opinions:
-            print(f"  ⚠️ No opinions for {dim_name}, skipping")
+            log_lines.append(f"  ⚠️ No opinions for {dim_name}, skipping")
             continue
         
         # Extract opinions by judge
-        prosecutor = next((o for o in dim_opinions if o.judge == "Prosecutor"), None)
-        defense = next((o for o in dim_opinions if o.judge == "Defense"), None)
-        tech = next((o for o in dim_opinions if o.judge == "TechLead"), None)
+        judges = judges_by_dim[dim_id]
+        prosecutor = judges.get("Prosecutor")
+        defense = judges.get("Defense")
+        tech = judges.get("TechLead")
         
         # Get scores (default to 3 if missing)
         prosecutor_score = prosecutor.score if prosecutor else 3
         defense_score = defense.score if defense else 3
         tech_score = tech.score if tech else 3
         
-        scores = [prosecutor_score, defense_score, tech_score]
+        # Aggregate the three scores once - every rule below reads these
+        high = max(prosecutor_score, defense_score, tech_score)
+        low = min(prosecutor_score, defense_score, tech_score)
+        total = prosecutor_score + defense_score + tech_score
         
-        print(f"\n  📋 {dim_name}:")
-        print(f"     Prosecutor: {prosecutor_score}, Defense: {defense_score}, Tech: {tech_score}")
+        log_lines.append(f"\n  📋 {dim_name}:")
+        log_lines.append(f"     Prosecutor: {prosecutor_score}, Defense: {defense_score}, Tech: {tech_score}")
         
         # ============ RULE 1: SECURITY OVERRIDE ============
+        # Cheapest check first: evidence is a precomputed flag (and its reason wins),
+        # so the prosecutor's argument is only scanned when evidence is clean
         security_override = False
         security_reason = None
         
-        if prosecutor and any(term in prosecutor.argument.lower() for term in 
-                            ["security", "vulnerability", "os.system", "injection", "sandbox", "unsafe"]):
-            security_override = True
-            security_reason = prosecutor.argument[:150]
-        
-        # Also check evidence for security issues
-        security_evidence = any(
-            e.dimension_id == "safe_tool_engineering" and not e.found
-            for e in evidences.get("repo", [])
-        )
-        
         if security_evidence:
             security_override = True
             security_reason = "Evidence shows security tooling issues"
+        elif prosecutor and SECURITY_TERMS_RE.search(prosecutor.argument_lc()):
+            security_override = True
+            security_reason = prosecutor.argument[:150]
         
         if security_override:
-            final_score = min(3, max(scores))
+            final_score = min(3, high)
             dissent = f"🔒 SECURITY OVERRIDE: Score capped at 3 due to security concerns. {security_reason}"
-            print(f"     🔒 Security override applied - score capped at {final_score}")
+            log_lines.append(f"     🔒 Security override applied - score capped at {final_score}")
         
         # ============ RULE 2: FACT SUPREMACY ============
-        elif defense and defense_score >= 4 and any(term in defense.argument.lower() for term in 
-                                                   ["deep", "understanding", "metacognition", "sophisticated", "excellent"]):
+        elif defense and defense_score >= 4 and DEEP_UNDERSTANDING_RE.search(defense.argument_lc()):
             # Check if evidence supports deep understanding claim
-            has_deep_evidence = any(
-                e.dimension_id == "theoretical_depth" and e.found and e.confidence > 0.7
-                for e in evidences.get("doc", [])
-            )
-            
             if not has_deep_evidence:
                 # Overrule defense, use tech lead score
                 final_score = tech_score
                 dissent = f"📊 FACT SUPREMACY: Defense claim of deep understanding not supported by evidence. Using Tech Lead score ({tech_score})."
-                print(f"     📊 Fact supremacy applied - overruling defense")
+                log_lines.append(f"     📊 Fact supremacy applied - overruling defense")
             else:
                 # Evidence supports defense
                 final_score = defense_score
                 dissent = None
-                print(f"     ✅ Defense claim supported by evidence")
+                log_lines.append(f"     ✅ Defense claim supported by evidence")
         
         # ============ RULE 3: FUNCTIONALITY WEIGHT FOR ARCHITECTURE ============
         elif dim_id == "graph_orchestration":
             # Tech Lead carries highest weight for architecture
             final_score = tech_score
             dissent = f"⚙️ FUNCTIONALITY WEIGHT: Tech Lead opinion prioritized for architecture criterion (score: {tech_score})"
-            print(f"     ⚙️ Functionality weight applied - using Tech Lead score")
+            log_lines.append(f"     ⚙️ Functionality weight applied - using Tech Lead score")
         
         # ============ DEFAULT: VARIANCE HANDLING ============
         else:
             # Calculate variance
-            score_variance = max(scores) - min(scores)
+            score_variance = high - low
             
             if score_variance > 2:
                 # RULE 4: DISSENT REQUIREMENT
                 # Use median instead of mean for robustness
-                sorted_scores = sorted(scores)
-                final_score = sorted_scores[1]  # median
+                final_score = total - high - low  # median of three
                 dissent = f"⚖️ DISSENT: Significant disagreement (variance={score_variance}). Prosecutor={prosecutor_score}, Defense={defense_score}, Tech={tech_score}. Using median score {final_score}."
-                print(f"     ⚖️ Dissent detected - variance {score_variance} > 2")
+                log_lines.append(f"     ⚖️ Dissent detected - variance {score_variance} > 2")
                 
                 # RULE 5: VARIANCE RE-EVALUATION (implied by logging)
-                print(f"     ⚖️ Triggering variance re-evaluation for {dim_name}")
+                log_lines.append(f"     ⚖️ Triggering variance re-evaluation for {dim_name}")
             else:
                 # Low variance - use mean
-                final_score = round(sum(scores) / len(scores))
+                final_score = round(total / 3)
                 dissent = None
-                print(f"     ✅ Consensus - variance {score_variance} <= 2")
+                log_lines.append(f"     ✅ Consensus - variance {score_variance} <= 2")
         
         # Generate remediation based on final score
         remediation = generate_remediation(dim_id, final_score, evidences)
@@ -155,28 +183,25 @@ def chief_justice_node(state: AgentState) -> dict:
     )
     
     # ============ SERIALIZE TO MARKDOWN FILE ============
-    markdown = render_markdown_report(report)
-    timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+    # One instant names the file and stamps the report header
+    now = time.localtime()
+    markdown = render_markdown_report(report, now)
+    timestamp = time.strftime('%Y%m%d_%H%M%S', now)
     
     # Save self-audit report
-    filename = f"audit/report_onself_generated/audit_{timestamp}.md"
-    os.makedirs("audit/report_onself_generated", exist_ok=True)
-    
-    with open(filename, "w", encoding="utf-8") as f:
-        f.write(markdown)
+    filename = REPORT_DIR / f"audit_{timestamp}.md"
+    write_report(filename, markdown)
     
-    print(f"\n✅ Final report saved to: {filename}")
-    print(f"🏛️ Chief Justice synthesis complete. Overall score: {overall_score:.1f}/5")
+    log_lines.append(f"\n✅ Final report saved to: {filename}")
+    log_lines.append(f"🏛️ Chief Justice synthesis complete. Overall score: {overall_score:.1f}/5")
+    print("\n".join(log_lines), flush=True)
     
     return {"final_report": report}
 
-def generate_remediation(dim_id: str, score: int, evidences: dict) -> str:
-    """Generate specific file-level remediation instructions"""
-    if score >= 4:
-        return "No remediation needed. Implementation meets or exceeds expectations."
-    
-    remediation_map = {
-        "git_forensic_analysis": """**Issue:** Git history lacks clear progression from setup → tools → graph.
+# ============ REMEDIATION TEXT ============
+# Built once at import - generate_remediation only looks entries up
+_REMEDIATION_MAP = {
+    "git_forensic_analysis": """**Issue:** Git history lacks clear progression from setup → tools → graph.
 
 **Remediation:**
 1. Reorganize commits to show iterative development
@@ -185,8 +210,8 @@ def generate_remediation(dim_id: str, score: int, evidences: dict) -> str:
 4. Add timestamps showing development over time
 
 **Files to update:** Entire repository git history""",
-        
-        "state_management_rigor": """**Issue:** State management lacks proper Pydantic models or reducers.
+    
+    "state_management_rigor": """**Issue:** State management lacks proper Pydantic models or reducers.
 
 **Remediation:**
 1. Add Evidence class inheriting from BaseModel in src/state.py
@@ -195,19 +220,19 @@ def generate_remediation(dim_id: str, score: int, evidences: dict) -> str:
 4. Add field constraints (ge, le, descriptions)
 
 **Files to update:** src/state.py""",
-        
-        "graph_orchestration": """**Issue:** Graph lacks proper parallel fan-out/fan-in patterns.
+    
+    "graph_orchestration": """**Issue:** Graph lacks proper parallel fan-out/fan-in patterns.
 
 **Remediation:**
-1. Ensure START branches to all detectives in parallel
-2. Add evidence aggregator node as fan-in point
-3. Wire judges in parallel from aggregator
+1. Ensure START branches to all detectives in parallel (static edges or Send)
+2. Join the detective branches at one fan-in point, merged by a state reducer
+3. Wire judges in parallel from that fan-in, then into one synthesis node
 4. Add conditional edges for error handling
 5. Verify two distinct parallel layers exist
 
 **Files to update:** src/graph.py""",
-        
-        "safe_tool_engineering": """**Issue:** Tools lack proper sandboxing or use unsafe operations.
+    
+    "safe_tool_engineering": """**Issue:** Tools lack proper sandboxing or use unsafe operations.
 
 **Remediation:**
 1. Replace any os.system calls with subprocess.run()
@@ -217,8 +242,8 @@ def generate_remediation(dim_id: str, score: int, evidences: dict) -> str:
 5. Add input sanitization for repository URLs
 
 **Files to update:** src/tools/repo_tools.py""",
-        
-        "structured_output_enforcement": """**Issue:** Judges not using structured output or missing retry logic.
+    
+    "structured_output_enforcement": """**Issue:** Judges not using structured output or missing retry logic.
 
 **Remediation:**
 1. Add .with_structured_output(JudicialOpinion) to all judge nodes
@@ -227,8 +252,8 @@ def generate_remediation(dim_id: str, score: int, evidences: dict) -> str:
 4. Validate all opinions against schema before adding to state
 
 **Files to update:** src/nodes/judges.py""",
-        
-        "judicial_nuance": """**Issue:** Judge personas not sufficiently distinct or missing conflicting philosophies.
+    
+    "judicial_nuance": """**Issue:** Judge personas not sufficiently distinct or missing conflicting philosophies.
 
 **Remediation:**
 1. Ensure Prosecutor prompt is adversarial (looks for flaws)
@@ -238,8 +263,8 @@ def generate_remediation(dim_id: str, score: int, evidences: dict) -> str:
 5. Add explicit scoring guidelines for each persona
 
 **Files to update:** src/nodes/judges.py""",
-        
-        "chief_justice_synthesis": """**Issue:** Synthesis lacks deterministic rules or uses LLM averaging.
+    
+    "chief_justice_synthesis": """**Issue:** Synthesis lacks deterministic rules or uses LLM averaging.
 
 **Remediation:**
 1. Implement security override rule (flaws cap score at 3)
@@ -249,8 +274,8 @@ def generate_remediation(dim_id: str, score: int, evidences: dict) -> str:
 5. Write report to file, not console
 
 **Files to update:** src/nodes/justice.py""",
-        
-        "theoretical_depth": """**Issue:** PDF report lacks deep explanation of key concepts.
+    
+    "theoretical_depth": """**Issue:** PDF report lacks deep explanation of key concepts.
 
 **Remediation:**
 1. Add detailed section on Dialectical Synthesis with code examples
@@ -260,8 +285,8 @@ def generate_remediation(dim_id: str, score: int, evidences: dict) -> str:
 5. Reference specific file paths in explanations
 
 **Files to update:** reports/final_report.pdf""",
-        
-        "report_accuracy": """**Issue:** PDF report mentions files that don't exist or makes unsupported claims.
+    
+    "report_accuracy": """**Issue:** PDF report mentions files that don't exist or makes unsupported claims.
 
 **Remediation:**
 1. Verify all file paths mentioned actually exist in repository
@@ -271,8 +296,8 @@ def generate_remediation(dim_id: str, score: int, evidences: dict) -> str:
 5. Update report to reflect actual implementation
 
 **Files to update:** reports/final_report.pdf""",
-        
-        "swarm_visual": """**Issue:** Missing or inaccurate architecture diagrams.
+    
+    "swarm_visual": """**Issue:** Missing or inaccurate architecture diagrams.
 
 **Remediation:**
 1. Add clear diagram showing parallel fan-out/fan-in for detectives
@@ -282,83 +307,126 @@ def generate_remediation(dim_id: str, score: int, evidences: dict) -> str:
 5. Use Mermaid syntax for GitHub rendering
 
 **Files to update:** reports/final_report.pdf, README.md"""
-    }
+}
+
+def write_report(filename: Path, markdown: str) -> None:
+    """Write the report in one call - the directory is only created when missing"""
+    data = markdown.encode("utf-8")
+    try:
+        filename.write_bytes(data)
+    except FileNotFoundError:
+        filename.parent.mkdir(parents=True, exist_ok=True)
+        filename.write_bytes(data)
+
+def generate_remediation(dim_id: str, score: int, evidences: dict) -> str:
+    """Generate specific file-level remediation instructions"""
+    return _remediation_for(dim_id, score >= 4)
+
+@lru_cache(maxsize=None)
+def _remediation_for(dim_id: str, meets_expectations: bool) -> str:
+    """Remediation text only depends on the dimension and pass/fail - build each once per process"""
+    if meets_expectations:
+        return "No remediation needed. Implementation meets or exceeds expectations."
     
-    return remediation_map.get(dim_id, f"Review implementation of {dim_id} against rubric requirements and improve accordingly.")
+    return _REMEDIATION_MAP.get(dim_id, f"Review implementation of {dim_id} against rubric requirements and improve accordingly.")
 
 def generate_executive_summary(criteria: list) -> str:
     """Generate executive summary with strengths and weaknesses"""
-    avg_score = sum(c.final_score for c in criteria) / len(criteria) if criteria else 0
-    strengths = [c.dimension_name for c in criteria if c.final_score >= 4]
-    weaknesses = [c.dimension_name for c in criteria if c.final_score <= 2]
-    needs_attention = [c.dimension_name for c in criteria if 2 < c.final_score < 4]
+    # One pass: total the scores and sort each dimension into its band
+    total = 0
+    strengths, weaknesses, needs_attention = [], [], []
+    for c in criteria:
+        score = c.final_score
+        total += score
+        (strengths if score >= 4 else weaknesses if score <= 2 else needs_attention).append(c.dimension_name)
+    avg_score = total / len(criteria) if criteria else 0
     
-    summary = f"""## Executive Summary
+    parts = [f"""## Executive Summary
 
 **Overall Score: {avg_score:.1f}/5**
 
 ### Key Findings
-"""
+"""]
     if strengths:
-        summary += "\n**Strengths:**\n"
-        for s in strengths:
-            summary += f"- ✅ {s}\n"
+        parts.append("\n**Strengths:**\n")
+        parts.extend(f"- ✅ {s}\n" for s in strengths)
     
     if needs_attention:
-        summary += "\n**Needs Attention:**\n"
-        for n in needs_attention:
-            summary += f"- 📌 {n}\n"
+        parts.append("\n**Needs Attention:**\n")
+        parts.extend(f"- 📌 {n}\n" for n in needs_attention)
     
     if weaknesses:
-        summary += "\n**Critical Issues:**\n"
-        for w in weaknesses:
-            summary += f"- ⚠️ {w}\n"
+        parts.append("\n**Critical Issues:**\n")
+        parts.extend(f"- ⚠️ {w}\n" for w in weaknesses)
     
-    summary += f"""
+    parts.append(f"""
 ### Summary
 The system demonstrates {'strong' if avg_score >= 4 else 'adequate' if avg_score >= 3 else 'weak'} implementation across {len(criteria)} dimensions. 
 {'Focus on addressing critical issues and areas needing attention.' if weaknesses or needs_attention else 'All dimensions meet or exceed expectations.'}
-"""
-    return summary
+""")
+    return "".join(parts)
 
 def generate_remediation_plan(criteria: list) -> str:
     """Generate comprehensive remediation plan with priorities"""
-    plan = "## Remediation Plan\n\n"
+    parts = ["## Remediation Plan\n\n"]
     
-    # Sort by priority (lowest scores first)
-    sorted_criteria = sorted(criteria, key=lambda c: c.final_score)
+    # Bucket by score in one pass (lowest scores first) - scores are 1-5, so
+    # concatenating the buckets gives the same order as a stable sort
+    by_score = {score: [] for score in range(1, 6)}
+    for c in criteria:
+        by_score[c.final_score].append(c)
     
     priority_levels = {
-        "critical": [c for c in sorted_criteria if c.final_score <= 2],
-        "high": [c for c in sorted_criteria if 2 < c.final_score < 4],
-        "low": [c for c in sorted_criteria if c.final_score >= 4]
+        "critical": by_score[1] + by_score[2],
+        "high": by_score[3],
+        "low": by_score[4] + by_score[5]
     }
     
     if priority_levels["critical"]:
-        plan += "### 🔴 CRITICAL PRIORITY (Must Fix)\n\n"
+        parts.append("### 🔴 CRITICAL PRIORITY (Must Fix)\n\n")
         for c in priority_levels["critical"]:
-            plan += f"#### {c.dimension_name}\n"
-            plan += f"{c.remediation}\n\n"
+            parts.append(f"#### {c.dimension_name}\n{c.remediation}\n\n")
     
     if priority_levels["high"]:
-        plan += "### 🟡 HIGH PRIORITY (Should Fix)\n\n"
+        parts.append("### 🟡 HIGH PRIORITY (Should Fix)\n\n")
         for c in priority_levels["high"]:
-            plan += f"#### {c.dimension_name}\n"
-            plan += f"{c.remediation}\n\n"
+            parts.append(f"#### {c.dimension_name}\n{c.remediation}\n\n")
     
     if priority_levels["low"]:
-        plan += "### 🟢 LOW PRIORITY (Nice to Have)\n\n"
+        parts.append("### 🟢 LOW PRIORITY (Nice to Have)\n\n")
         for c in priority_levels["low"]:
-            plan += f"#### {c.dimension_name}\n"
-            plan += f"{c.remediation}\n\n"
+            parts.append(f"#### {c.dimension_name}\n{c.remediation}\n\n")
     
-    return plan
+    return "".join(parts)
+
+def render_opinion_line(o: JudicialOpinion) -> str:
+    """One judge opinion as a bullet - arguments are truncated for readability"""
+    arg = o.argument[:200] + "..." if len(o.argument) > 200 else o.argument
+    return f"- **{o.judge}** (Score: {o.score}): {arg}\n"
+
+def render_criterion(i: int, c: CriterionResult) -> str:
+    """One criterion section, built as a single f-string"""
+    opinions = "".join(map(render_opinion_line, c.judge_opinions))
+    dissent = f"\n**Dissent:** {c.dissent_summary}\n" if c.dissent_summary else ""
+    return f"""
+### {i}. {c.dimension_name}
+**Final Score: {c.final_score}/5**
+
+**Judge Opinions:**
+{opinions}{dissent}
+**Remediation:**
+{c.remediation}
 
-def render_markdown_report(report: AuditReport) -> str:
+---
+"""
+
+def render_markdown_report(report: AuditReport, now: Optional[time.struct_time] = None) -> str:
     """Render complete Markdown report with all required sections"""
-    md = f"""# 🤖 Automaton Auditor - Final Audit Report
+    now = now or time.localtime()
+    criteria = "".join(render_criterion(i, c) for i, c in enumerate(report.criteria, 1))
+    return f"""# 🤖 Automaton Auditor - Final Audit Report
 
-**Generated:** {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}  
+**Generated:** {time.strftime('%Y-%m-%d %H:%M:%S', now)}  
 **Repository:** {report.repo_url}  
 **Overall Score:** {report.overall_score:.1f}/5
 
@@ -370,26 +438,7 @@ def render_markdown_report(report: AuditReport) -> str:
 
 ## Detailed Criterion Breakdown
 
-"""
-    for i, c in enumerate(report.criteria, 1):
-        md += f"""
-### {i}. {c.dimension_name}
-**Final Score: {c.final_score}/5**
-
-**Judge Opinions:**
-"""
-        for o in c.judge_opinions:
-            # Truncate arguments for readability
-            arg = o.argument[:200] + "..." if len(o.argument) > 200 else o.argument
-            md += f"- **{o.judge}** (Score: {o.score}): {arg}\n"
-        
-        if c.dissent_summary:
-            md += f"\n**Dissent:** {c.dissent_summary}\n"
-        
-        md += f"\n**Remediation:**\n{c.remediation}\n"
-        md += "\n---\n"
-    
-    md += f"""
+{criteria}
 
 {report.remediation_plan}
 
@@ -397,4 +446,3 @@ def render_markdown_report(report: AuditReport) -> str:
 
 *Report generated by Automaton Auditor v1.0*
 """
-    return md
\ No newline at end of file
@@ -1,48 +1,57 @@
 """VisionInspector detective for diagram analysis - implementation required, execution optional"""
 
 from ..state import AgentState, Evidence
-import json
+import asyncio
 from pathlib import Path
+from typing import List
 
-def vision_inspector_node(state: AgentState) -> dict:
+def find_image_pages(pdf_path: str) -> List[int]:
+    """Blocking PDF scan - 1-based numbers of pages that embed images"""
+    from pypdf import PdfReader
+    reader = PdfReader(pdf_path)
+    
+    diagram_pages = []
+    for i, page in enumerate(reader.pages):
+        # Check for images in page resources - pages without resources simply have none
+        resources = page.get('/Resources')
+        xObject = resources.get_object().get('/XObject') if resources else None
+        xObject = xObject.get_object() if xObject is not None else None
+        if not xObject:
+            continue
+        # One image is enough to mark the page - stop materializing its other XObjects
+        for obj in xObject:
+            if xObject[obj].get('/Subtype') == '/Image':
+                diagram_pages.append(i + 1)
+                break
+    return diagram_pages
+
+async def vision_inspector_node(state: AgentState) -> dict:
     """
     Analyzes diagrams in PDF using multimodal vision.
     Implementation follows challenge requirements (execution optional).
+    The PDF scan runs on a worker thread, overlapping the other detectives.
     """
     evidences = []
     pdf_path = state.get("pdf_path")
     
     if not pdf_path:
-        return {"evidences": {"vision": []}}
+        return {"evidences": {"vision": []}, "evidence_count": 0}
     
     try:
         # Basic implementation to check for images in PDF
-        from pypdf import PdfReader
-        reader = PdfReader(pdf_path)
-        
-        has_diagrams = False
-        diagram_pages = []
-        
-        for i, page in enumerate(reader.pages):
-            # Check for images in page resources
-            if '/XObject' in page['/Resources']:
-                xObject = page['/Resources']['/XObject'].get_object()
-                if xObject:
-                    for obj in xObject:
-                        if xObject[obj]['/Subtype'] == '/Image':
-                            has_diagrams = True
-                            diagram_pages.append(i + 1)
+        diagram_pages = await asyncio.to_thread(find_image_pages, pdf_path)
+        has_diagrams = bool(diagram_pages)
         
-        evidences.append(Evidence(
+        # Built from our own typed scan results - validation is skipped, as for the other detectives
+        evidences.append(Evidence.model_construct(
             dimension_id="swarm_visual",
-            detective="VisionInspector",
             goal="Verify architectural diagrams show parallel flow (fan-out/fan-in)",
             found=has_diagrams,
-            content=json.dumps({
+            content={
                 "has_diagrams": has_diagrams,
                 "diagram_pages": diagram_pages,
                 "note": "Full diagram analysis requires multimodal LLM (optional)"
-            }, indent=2),
+            },
             location=pdf_path,
             rationale=f"Found {'diagrams' if has_diagrams else 'no diagrams'} in PDF. Pages with images: {diagram_pages}",
             confidence=0.8 if has_diagrams else 0.3,
@@ -50,9 +59,8 @@ def vision_inspector_node(state: AgentState) -> dict:
         ))
         
     except Exception as e:
-        evidences.append(Evidence(
+        evidences.append(Evidence.model_construct(
             dimension_id="swarm_visual",
-            detective="VisionInspector",
             goal="Verify architectural diagrams show parallel flow",
             found=False,
             content=str(e),
@@ -62,4 +70,4 @@ def vision_inspector_node(state: AgentState) -> dict:
             collected_by="VisionInspector"
         ))
     
-    return {"evidences": {"vision": evidences}}
\ No newline at end of file
+    return {"evidences": {"vision": evidences}, "evidence_count": len(evidences)}
\ No newline at end of file
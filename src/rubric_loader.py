@@ -1,8 +1,16 @@
 """Dynamically load the rubric.json constitution"""
 
 import json
+from functools import lru_cache
 from pathlib import Path
-from typing import Dict, List, Any, Optional
+from types import MappingProxyType
+from typing import Dict, List, Any, Optional, Tuple
+
+# orjson parses several times faster and ships with langgraph/langsmith; stdlib json is the fallback
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
 class RubricLoader:
     """Load and serve the constitution (rubric.json) - dynamic loading"""
@@ -10,6 +18,19 @@ class RubricLoader:
     def __init__(self, rubric_path: str = "rubric.json"):
         self.rubric_path = Path(rubric_path)
         self.rubric = self._load()
+        self._build_indices()
+    
+    def _build_indices(self) -> None:
+        """Index dimensions once - every lookup below is then O(1)"""
+        dimensions = self.get_dimensions()
+        by_artifact: Dict[str, List[Dict]] = {}
+        for dim in dimensions:
+            by_artifact.setdefault(dim.get("target_artifact"), []).append(dim)
+        
+        # Read-only views - the loader is shared process-wide, so callers must not mutate them
+        self._by_id = MappingProxyType({dim["id"]: dim for dim in dimensions})
+        self._by_artifact = MappingProxyType({k: tuple(v) for k, v in by_artifact.items()})
+        self._names = tuple(dim["name"] for dim in dimensions)
     
     def _load(self) -> Dict[str, Any]:
         """Load rubric from JSON file"""
@@ -19,8 +40,8 @@ class RubricLoader:
                 "Please ensure rubric.json is in the project root."
             )
         
-        with open(self.rubric_path, 'r', encoding='utf-8') as f:
-            return json.load(f)
+        data = self.rubric_path.read_bytes()
+        return orjson.loads(data) if orjson else json.loads(data)
     
     def get_dimensions(self) -> List[Dict]:
         """Get all rubric dimensions"""
@@ -28,10 +49,7 @@ class RubricLoader:
     
     def get_dimension(self, dimension_id: str) -> Dict:
         """Get specific dimension by ID"""
-        for dim in self.get_dimensions():
-            if dim["id"] == dimension_id:
-                return dim
-        return {}
+        return self._by_id.get(dimension_id, {})
     
     def get_forensic_instruction(self, dimension_id: str) -> str:
         """Get forensic instruction for a detective"""
@@ -42,17 +60,28 @@ class RubricLoader:
         """Get synthesis rules for Chief Justice (for final)"""
         return self.rubric.get("synthesis_rules", {})
     
-    def get_dimensions_by_artifact(self, artifact: str) -> List[Dict]:
+    def get_dimensions_by_artifact(self, artifact: str) -> Tuple[Dict, ...]:
         """Get dimensions targeting specific artifact (github_repo or pdf_report)"""
-        return [
-            dim for dim in self.get_dimensions()
-            if dim.get("target_artifact") == artifact
-        ]
+        return self._by_artifact.get(artifact, ())
     
-    def get_dimension_names(self) -> List[str]:
-        """Get list of dimension names"""
-        return [dim["name"] for dim in self.get_dimensions()]
+    def get_dimension_names(self) -> Tuple[str, ...]:
+        """Get dimension names"""
+        return self._names
     
     def get_rubric_metadata(self) -> Dict:
         """Get rubric metadata"""
-        return self.rubric.get("rubric_metadata", {})
\ No newline at end of file
+        return self.rubric.get("rubric_metadata", {})
+
+@lru_cache(maxsize=8)
+def _cached_rubric(resolved_path: str, mtime_ns: int) -> RubricLoader:
+    """One loader per (file, version) - mtime is part of the key so edits are picked up"""
+    return RubricLoader(resolved_path)
+
+def get_rubric(rubric_path: str = "rubric.json") -> RubricLoader:
+    """Shared loader - the rubric is parsed once per process until the file changes"""
+    path = Path(rubric_path).resolve()
+    try:
+        mtime_ns = path.stat().st_mtime_ns
+    except OSError:
+        return RubricLoader(rubric_path)  # raises the usual "Rubric not found" error
+    return _cached_rubric(str(path), mtime_ns)
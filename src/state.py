@@ -1,29 +1,54 @@
 """State management with Pydantic models and reducers for parallel safety"""
 
-from typing import Annotated, List, Dict, Literal, Optional, Any
+from typing import Annotated, List, Dict, Literal, Optional, Any, Union
 from typing_extensions import TypedDict
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field, PrivateAttr
+import json
 import operator
 from datetime import datetime
 
+# Graph outputs are written once and then only read by later nodes - freezing
+# them makes that explicit and lets parallel branches share instances safely.
+# Validators are built on first use, so importing the models stays cheap.
+FROZEN = ConfigDict(frozen=True, defer_build=True)
+
 # ===== DETECTIVE OUTPUT =====
 
 class Evidence(BaseModel):
     """Forensic evidence collected by detectives - pure facts, no opinions"""
+    model_config = FROZEN
+
     dimension_id: str = Field(description="Rubric dimension this evidence addresses") 
     goal: str = Field(description="What we were looking for (rubric criterion)")
     found: bool = Field(description="Whether the artifact exists")
-    content: Optional[str] = Field(default=None, description="Relevant content snippet")
+    content: Optional[Union[str, Dict[str, Any], List[Any]]] = Field(
+        default=None,
+        description="Relevant content snippet, or the raw structured analysis"
+    )
     location: str = Field(description="File path, commit hash, or page number")
     rationale: str = Field(description="Why you're confident in this evidence")
     confidence: float = Field(ge=0, le=1, description="Confidence score 0-1")
     collected_by: str = Field(description="Which detective collected this")
     timestamp: datetime = Field(default_factory=datetime.now)
 
+    # Serialized content, built on first use and shared by every judge
+    _content_text: Optional[str] = PrivateAttr(default=None)
+
+    def content_text(self) -> str:
+        """Content as text - structured content is compact-serialized once, on demand"""
+        if self._content_text is None:
+            if self.content is None or isinstance(self.content, str):
+                self._content_text = self.content or ""
+            else:
+                self._content_text = json.dumps(self.content, separators=(",", ":"), default=str)
+        return self._content_text
+
 # ===== JUDICIAL OUTPUT =====
 
 class JudicialOpinion(BaseModel):
     """Opinion from a single judge persona"""
+    model_config = FROZEN
+
     judge: Literal["Prosecutor", "Defense", "TechLead"]
     criterion_id: str
     score: int = Field(ge=1, le=5, description="Score 1-5 per rubric")
@@ -31,10 +56,21 @@ class JudicialOpinion(BaseModel):
     cited_evidence: List[str] = Field(description="Evidence IDs/locations used")
     timestamp: datetime = Field(default_factory=datetime.now)
 
+    # Lowercased argument, built on first use and shared by every synthesis rule
+    _argument_lc: Optional[str] = PrivateAttr(default=None)
+
+    def argument_lc(self) -> str:
+        """Argument in lowercase - computed once, on demand"""
+        if self._argument_lc is None:
+            self._argument_lc = self.argument.lower()
+        return self._argument_lc
+
 # ===== CHIEF JUSTICE OUTPUT - ADD THESE CLASSES =====
 
 class CriterionResult(BaseModel):
     """Final result for a single rubric criterion"""
+    model_config = FROZEN
+
     dimension_id: str
     dimension_name: str
     final_score: int = Field(ge=1, le=5)
@@ -47,6 +83,8 @@ class CriterionResult(BaseModel):
 
 class AuditReport(BaseModel):
     """Complete audit report"""
+    model_config = FROZEN
+
     repo_url: str
     executive_summary: str
     overall_score: float
@@ -56,6 +94,20 @@ class AuditReport(BaseModel):
 
 # ===== GRAPH STATE WITH REDUCERS =====
 
+def merge_evidences(left: Dict[str, List[Evidence]], right: Dict[str, List[Evidence]]) -> Dict[str, List[Evidence]]:
+    """
+    Reducer: merge evidence dicts from parallel detectives, concatenating lists per key.
+    Inputs are never mutated (earlier snapshots may share them); a list is only
+    copied when two updates write the same key, so a fan-in stays linear.
+    """
+    if not left:
+        return dict(right)
+    merged = dict(left)
+    for source, ev_list in right.items():
+        current = merged.get(source)
+        merged[source] = current + ev_list if current else ev_list
+    return merged
+
 class AgentState(TypedDict):
     """State passed through LangGraph with reducers for parallel safety"""
     # Input
@@ -65,8 +117,11 @@ class AgentState(TypedDict):
     # Rubric (loaded from JSON)
     rubric_dimensions: List[Dict[str, Any]]
 
-    # Evidence collection - uses ior to MERGE dicts from parallel detectives
-    evidences: Annotated[Dict[str, List[Evidence]], operator.ior]
+    # Evidence collection - merge_evidences MERGES dicts from parallel detectives
+    evidences: Annotated[Dict[str, List[Evidence]], merge_evidences]
+
+    # Running total of evidence items - each detective adds its own count
+    evidence_count: Annotated[int, operator.add]
 
     # Judicial opinions - uses add to COLLECT from parallel judges
     opinions: Annotated[List[JudicialOpinion], operator.add]
@@ -1,33 +1,209 @@
 """PDF forensic tools with RAG-lite approach - chunked querying"""
 
 import pypdf
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from functools import cached_property, lru_cache
+from io import BytesIO
+from itertools import repeat
+from multiprocessing import get_context
 from pathlib import Path
-from typing import List, Dict, Any, Optional
+from typing import BinaryIO, List, Dict, Any, FrozenSet, Optional, Tuple, Union
 import hashlib
+import json
+import os
 import re
+import zlib
+
+from ..cache_paths import cache_dir
+
+# Optional native backend (PDFium, C bindings) - much faster text extraction.
+# Install with: pip install "automaton-auditor[pdf-fast]"; pypdf is the fallback.
+try:
+    import pypdfium2 as pdfium
+except ImportError:
+    pdfium = None
+
+# Read the whole PDF in one bulk transfer (matters on network filesystems)
+PDF_READ_BUFFER = 1 << 20
+
+# Extracted page text, keyed by PDF content hash - re-audits skip parsing entirely
+PDF_CACHE_DIR = cache_dir("pdf")
+
+# Large PDFs are parsed on several processes, one contiguous page range each.
+# Below the threshold, worker start-up costs more than it saves.
+PARALLEL_PAGE_THRESHOLD = 32
+PDF_PARSE_WORKERS = os.cpu_count() or 1
+
+# Parsed and chunked PDFs for this process, keyed by content hash - a repeat
+# audit of the same report goes straight to querying. Entries are shared, read-only.
+PDF_INDEX_CACHE_SIZE = 8
+_pdf_index: Dict[str, Tuple[str, List[str], List[Dict]]] = {}
+
+# File paths mentioned in a report (src/...py, tests/...py, etc.)
+FILE_PATH_PATTERNS = [re.compile(p) for p in (
+    r'src/[a-zA-Z0-9_/]+\.py',
+    r'tests/[a-zA-Z0-9_/]+\.py',
+    r'[a-zA-Z0-9_]+\.py',
+    r'[a-zA-Z0-9_/]+\.md',
+    r'\./[a-zA-Z0-9_/]+\.py'
+)]
+# Every path pattern matches inside one run of these characters, so scanning
+# only the runs that mention .py/.md finds exactly the same paths
+PATH_TOKEN_RE = re.compile(r'[a-zA-Z0-9_/.]*\.(?:py|md)[a-zA-Z0-9_/.]*')
+
+def _pdfium_page_range(document, start: int, end: int) -> List[str]:
+    """Texts of pages [start, end) of an open PDFium document"""
+    page_texts = []
+    for index in range(start, end):
+        page = document[index]
+        textpage = page.get_textpage()
+        page_texts.append(textpage.get_text_range().replace("\r\n", "\n"))
+        textpage.close()
+        page.close()
+    return page_texts
+
+def _parse_page_range(pdf_bytes: bytes, start: int, end: int, backend: str) -> List[str]:
+    """Worker: open the PDF in this process and extract pages [start, end)"""
+    if backend == "pdfium":
+        document = pdfium.PdfDocument(pdf_bytes)
+        try:
+            return _pdfium_page_range(document, start, end)
+        finally:
+            document.close()
+    
+    reader = pypdf.PdfReader(BytesIO(pdf_bytes))
+    return [reader.pages[index].extract_text() for index in range(start, end)]
+
+def parse_pages_parallel(pdf_bytes: bytes, page_count: int, backend: str) -> List[str]:
+    """Extract page texts on a process pool, one contiguous range per worker, in page order"""
+    workers = min(PDF_PARSE_WORKERS, page_count)
+    step = -(-page_count // workers)  # ceil division
+    ranges = [(start, min(start + step, page_count)) for start in range(0, page_count, step)]
+    
+    # spawn, not fork - this runs on a worker thread of an asyncio process
+    try:
+        with ProcessPoolExecutor(max_workers=len(ranges), mp_context=get_context("spawn")) as pool:
+            parts = pool.map(_parse_page_range, repeat(pdf_bytes), *zip(*ranges), repeat(backend))
+            return [text for part in parts for text in part]
+    except (OSError, BrokenProcessPool):
+        # No worker processes available here - parse in this process instead
+        return _parse_page_range(pdf_bytes, 0, page_count, backend)
+
+@lru_cache(maxsize=32)
+def concept_pattern(concepts: FrozenSet[str]) -> "re.Pattern[str]":
+    """
+    One matcher for a whole concept set, compiled once per set per process.
+    The lookahead union reports every concept start position; longest first.
+    """
+    alternatives = sorted(concepts, key=lambda c: (-len(c), c))
+    return re.compile("(?=(" + "|".join(map(re.escape, alternatives)) + "))")
 
 class DocAnalyst:
     """PDF detective with chunked text extraction - RAG-lite approach"""
     
-    def __init__(self, pdf_path: str):
-        self.pdf_path = Path(pdf_path)
+    def __init__(self, pdf_path: Union[str, Path, bytes, BinaryIO]):
+        """Accepts a path, or the PDF already in memory (bytes or a binary file object)"""
+        if isinstance(pdf_path, (bytes, bytearray, memoryview)):
+            self.pdf_path = None
+            self.pdf_bytes = bytes(pdf_path)  # Seeds the cached_property - never touches disk
+        elif hasattr(pdf_path, "read"):
+            self.pdf_path = None
+            self.pdf_bytes = pdf_path.read()
+        else:
+            self.pdf_path = Path(pdf_path)
         self.full_text = None
+        self.pages: List[str] = []
         self.chunks = []
-        
-    def extract_text(self) -> str:
-        """Extract all text from PDF"""
+        self._indexed = False  # Set once chunks exist - even an empty PDF is only chunked once
+
+    @cached_property
+    def pdf_bytes(self) -> bytes:
+        """Raw PDF bytes - read once with a large buffer, shared by every parse"""
         if not self.pdf_path.exists():
             raise FileNotFoundError(f"PDF not found: {self.pdf_path}")
         
-        reader = pypdf.PdfReader(self.pdf_path)
-        text = ""
-        for page_num, page in enumerate(reader.pages):
-            page_text = page.extract_text()
-            text += f"\n--- Page {page_num + 1} ---\n{page_text}\n"
+        with open(self.pdf_path, "rb", buffering=PDF_READ_BUFFER) as f:
+            return f.read()
+        
+    @cached_property
+    def content_digest(self) -> str:
+        """SHA-256 of the PDF bytes - the key for both the disk and in-process caches"""
+        return hashlib.sha256(self.pdf_bytes).hexdigest()
+    
+    def build_index(self) -> List[Dict]:
+        """Text and default chunks, built once per PDF content per process"""
+        if self._indexed:
+            return self.chunks
+        if self.full_text is not None:
+            return self.chunk_text()  # Text was supplied directly - nothing to share
+        
+        cached = _pdf_index.get(self.content_digest)
+        if cached is not None:
+            self.full_text, pages, self.chunks = cached
+            self.pages = list(pages)
+            self._indexed = True
+            return self.chunks
+        
+        self.chunk_text()  # Extracts the text exactly once on the way
+        if len(_pdf_index) >= PDF_INDEX_CACHE_SIZE:
+            _pdf_index.pop(next(iter(_pdf_index)))  # Drop the oldest entry
+        _pdf_index[self.content_digest] = (self.full_text, list(self.pages), self.chunks)
+        return self.chunks
+    
+    def extract_text(self) -> str:
+        """Extract all text from PDF - parsed once, then served from cache"""
+        if self.full_text is not None:
+            return self.full_text
+
+        page_texts = self._cached_page_texts()
+        self.pages.extend(page_texts)
+        # One join over all pages - no quadratic string growth on long reports
+        text = "".join([
+            f"\n--- Page {page_num} ---\n{page_text}\n"
+            for page_num, page_text in enumerate(page_texts, 1)
+        ])
         
         self.full_text = text
         return text
     
+    def _cached_page_texts(self) -> List[str]:
+        """Page texts from the on-disk cache (SHA-256 of the PDF bytes), parsing only on a miss"""
+        backend = "pdfium" if pdfium else "pypdf"  # Backends differ slightly in whitespace
+        cache_path = PDF_CACHE_DIR / f"{self.content_digest}-{backend}.json"
+        
+        try:
+            return json.loads(cache_path.read_text(encoding="utf-8"))["pages"]
+        except (OSError, ValueError, KeyError):
+            pass  # Miss or unreadable entry - parse the PDF
+        
+        page_texts = self._page_texts_pdfium() if pdfium else self._page_texts_pypdf()
+        try:
+            cache_path.parent.mkdir(parents=True, exist_ok=True)
+            cache_path.write_text(json.dumps({"pages": page_texts}), encoding="utf-8")
+        except OSError:
+            pass  # Caching is best-effort
+        return page_texts
+    
+    def _page_texts_pypdf(self) -> List[str]:
+        """Per-page text via pure-Python pypdf"""
+        reader = pypdf.PdfReader(BytesIO(self.pdf_bytes))
+        page_count = len(reader.pages)
+        if page_count > PARALLEL_PAGE_THRESHOLD and PDF_PARSE_WORKERS > 1:
+            return parse_pages_parallel(self.pdf_bytes, page_count, "pypdf")
+        return [page.extract_text() for page in reader.pages]
+    
+    def _page_texts_pdfium(self) -> List[str]:
+        """Per-page raw text via PDFium - no structure tree, each text page freed right away"""
+        document = pdfium.PdfDocument(self.pdf_bytes)
+        try:
+            page_count = len(document)
+            if page_count > PARALLEL_PAGE_THRESHOLD and PDF_PARSE_WORKERS > 1:
+                return parse_pages_parallel(self.pdf_bytes, page_count, "pdfium")
+            return _pdfium_page_range(document, 0, page_count)
+        finally:
+            document.close()
+    
     def chunk_text(self, text: str = None, chunk_size: int = 500, overlap: int = 50) -> List[Dict]:
         """Split text into overlapping chunks (RAG-lite approach)"""
         if text is None:
@@ -45,9 +221,10 @@ class DocAnalyst:
             
             chunks.append({
                 "text": chunk_text,
+                "lower": chunk_text.lower(),  # Lowercased once here, not once per query
                 "start_idx": i,
                 "end_idx": i + len(chunk_words),
-                "chunk_id": hashlib.md5(chunk_text.encode()).hexdigest()[:8],
+                "chunk_id": f"{zlib.crc32(chunk_text.encode()):08x}",  # 32-bit id, like md5[:8] but ~5x faster
                 "word_count": len(chunk_words)
             })
             
@@ -55,20 +232,20 @@ class DocAnalyst:
                 break
         
         self.chunks = chunks
+        self._indexed = True
         return chunks
     
     def query_concept(self, concept: str, case_sensitive: bool = False) -> List[Dict]:
         """Simple text search for concepts (no vector DB needed for interim)"""
-        if not self.chunks:
-            self.extract_text()
-            self.chunk_text()
+        if not self._indexed:
+            self.build_index()
         
         concept_lower = concept.lower() if not case_sensitive else concept
         matches = []
         
         for chunk in self.chunks:
             chunk_text = chunk["text"]
-            search_text = chunk_text.lower() if not case_sensitive else chunk_text
+            search_text = chunk["lower"] if not case_sensitive else chunk_text
             
             if concept_lower in search_text:
                 # Get surrounding context
@@ -86,26 +263,55 @@ class DocAnalyst:
         if self.full_text is None:
             self.extract_text()
         
-        # Look for file paths (src/...py, tests/...py, etc.)
-        patterns = [
-            r'src/[a-zA-Z0-9_/]+\.py',
-            r'tests/[a-zA-Z0-9_/]+\.py',
-            r'[a-zA-Z0-9_]+\.py',
-            r'[a-zA-Z0-9_/]+\.md',
-            r'\./[a-zA-Z0-9_/]+\.py'
-        ]
-        
-        paths = []
-        for pattern in patterns:
-            matches = re.findall(pattern, self.full_text)
-            paths.extend(matches)
-        
-        return list(set(paths))  # Remove duplicates
+        # One pass finds every path-like token; the path patterns only run on those
+        paths = set()
+        for token in PATH_TOKEN_RE.findall(self.full_text):
+            for pattern in FILE_PATH_PATTERNS:
+                paths.update(pattern.findall(token))
+        
+        return list(paths)  # Remove duplicates
+    
+    def query_concepts(self, concepts: List[str]) -> Dict[str, List[Dict]]:
+        """
+        Case-insensitive search for many concepts in ONE pass over the chunks.
+        A lookahead union reports every concept start position, so results match
+        calling query_concept per concept.
+        """
+        if not self._indexed:
+            self.build_index()
+        
+        keys = {concept: concept.lower() for concept in concepts}
+        pattern = concept_pattern(frozenset(keys.values()))
+        matches = {concept: [] for concept in concepts}
+        
+        for chunk in self.chunks:
+            hits = {m.group(1) for m in pattern.finditer(chunk["lower"])}
+            if not hits:
+                continue
+            
+            for concept, key in keys.items():
+                # A longer concept matched at the same spot also contains this one
+                if key in hits or any(key in hit for hit in hits):
+                    matches[concept].append({
+                        "chunk_id": chunk["chunk_id"],
+                        "text": chunk["text"],
+                        "word_count": chunk["word_count"],
+                        "relevance": "exact_match"
+                    })
+        
+        return matches
     
     def check_concept_depth(self, concept: str) -> Dict[str, Any]:
         """Check if concept is explained deeply or just keyword-dropped"""
-        matches = self.query_concept(concept)
-        
+        return self.check_concepts_batch([concept])[concept]
+    
+    def check_concepts_batch(self, concepts: List[str]) -> Dict[str, Dict[str, Any]]:
+        """check_concept_depth for several concepts with a single scan of the chunks"""
+        found = self.query_concepts(concepts)
+        return {concept: self._depth_analysis(concept, found[concept]) for concept in concepts}
+    
+    def _depth_analysis(self, concept: str, matches: List[Dict]) -> Dict[str, Any]:
+        """Classify explanation depth from a concept's matching chunks"""
         analysis = {
             "concept": concept,
             "mentioned": len(matches) > 0,
@@ -1,14 +1,126 @@
 """Repository forensic tools with sandboxing and AST parsing"""
 
 import ast
+import asyncio
+import hashlib
+import shutil
 import subprocess
 import tempfile
+from collections import deque
+from functools import lru_cache
 from pathlib import Path
 from typing import List, Dict, Optional, Any
-import git
 from datetime import datetime
 import os
 
+from ..cache_paths import cache_dir
+
+# Partial clone: recent history only, blobs fetched on demand.
+# 50 commits is plenty for progression analysis (which looks at the last 20);
+# analyze_git_history flags its commit count as truncated on such clones.
+CLONE_DEPTH = 50
+CLONE_ARGS = [f"--depth={CLONE_DEPTH}", "--filter=blob:none", "--single-branch", "--no-tags"]
+
+# Each URL is cloned once (bare) into a per-user cache; later investigations only
+# fetch what changed and check out a worktree inside their own sandbox.
+REPO_CACHE_DIR = cache_dir("repos")
+GIT_TIMEOUT = 60
+# ls-remote only reads one ref - an unreachable host should not hold up the clone for long
+LS_REMOTE_TIMEOUT = 10
+
+def run_git(*args: str, timeout: float = GIT_TIMEOUT) -> subprocess.CompletedProcess:
+    """Run git without a shell - raises CalledProcessError / TimeoutExpired"""
+    return subprocess.run(
+        ["git", *args],
+        capture_output=True,
+        stdin=subprocess.DEVNULL,
+        # Never block on a credential prompt (private/missing repo) - fail fast
+        env={**os.environ, "GIT_TERMINAL_PROMPT": "0"},
+        text=True,
+        timeout=timeout,
+        check=True
+    )
+
+def remote_head(repo_url: str) -> Optional[str]:
+    """Commit the remote HEAD points at (one ls-remote round trip), or None if unreachable"""
+    try:
+        output = run_git("ls-remote", repo_url, "HEAD", timeout=LS_REMOTE_TIMEOUT).stdout
+    except (subprocess.SubprocessError, OSError):
+        return None
+    return output.split()[0] if output.strip() else None
+
+# History comes from one `git log` instead of a `git diff` per commit. Fields are
+# split on ASCII US, records on RS. --no-renames counts files like a plain diff and
+# never hydrates blobs in the partial clone.
+HISTORY_COMMITS = 20
+GIT_LOG_FORMAT = "%x1e%H%x1f%ct%x1f%B%x1f"
+
+# Progression keywords are matched as substrings of the lowercased commit messages,
+# so entries another one already covers are left out ("init" covers "initial",
+# "tool" covers "repo_tools"/"doc_tools", "graph" covers "stategraph").
+SETUP_KEYWORDS = ("setup", "env", "init", "bootstrap")
+TOOL_KEYWORDS = ("tool", "ast", "parser", "git")
+GRAPH_KEYWORDS = ("graph", "orchestration", "node", "edge", "parallel")
+
+# ============ SOURCE CACHE ============
+# Several analyzers read (and parse) the same files - key on (path, mtime, size)
+# so each file is read and parsed once until it actually changes.
+# Trees are also kept by SHA-256 of the source in this process - a fresh checkout of
+# the same code gets new paths (missing the stat-keyed cache) but the same digests.
+AST_MEMORY_CACHE_SIZE = 64
+_ast_by_digest: Dict[str, ast.AST] = {}
+
+def _source_key(path: Path) -> tuple:
+    st = path.stat()
+    return str(path), st.st_mtime_ns, st.st_size
+
+@lru_cache(maxsize=256)
+def _read_cached(path_str: str, mtime_ns: int, size: int) -> str:
+    return Path(path_str).read_text()
+
+@lru_cache(maxsize=256)
+def _parse_cached(path_str: str, mtime_ns: int, size: int) -> ast.AST:
+    return load_ast(_read_cached(path_str, mtime_ns, size))
+
+def load_ast(source: str) -> ast.AST:
+    """Parse source via the in-process digest cache, parsing only on a miss"""
+    key = hashlib.sha256(source.encode()).hexdigest()
+    tree = _ast_by_digest.get(key)
+    if tree is None:
+        tree = ast.parse(source)
+        if len(_ast_by_digest) >= AST_MEMORY_CACHE_SIZE:
+            _ast_by_digest.pop(next(iter(_ast_by_digest)), None)  # Drop the oldest entry
+        _ast_by_digest[key] = tree
+    return tree
+
+def read_source(path: Path) -> str:
+    """File contents, shared across analyzers"""
+    return _read_cached(*_source_key(path))
+
+def parse_source(path: Path) -> ast.AST:
+    """Parsed module, shared across analyzers - treat as read-only"""
+    return _parse_cached(*_source_key(path))
+
+# Every positive finding in analyze_graph_structure needs one of these names in the source
+GRAPH_MARKERS = ("StateGraph", "add_edge", "add_conditional_edges", "add_node", "Annotated")
+
+def walk_bfs(tree: ast.AST):
+    """
+    ast.walk without its per-node generator overhead - same breadth-first order,
+    minus the Load/Store/Del context leaves no analyzer looks at.
+    """
+    todo = deque([tree])
+    while todo:
+        node = todo.popleft()
+        for field in node._fields:
+            value = getattr(node, field, None)
+            if type(value) is list:
+                todo.extend([item for item in value
+                             if isinstance(item, ast.AST) and not isinstance(item, ast.expr_context)])
+            elif isinstance(value, ast.AST) and not isinstance(value, ast.expr_context):
+                todo.append(value)
+        yield node
+
 class RepoInvestigator:
     """Forensic code detective with AST parsing - sandboxed and safe"""
     
@@ -16,6 +128,7 @@ class RepoInvestigator:
         self.repo_url = repo_url
         self.temp_dir = None
         self.repo_path = None
+        self.bare_path = None  # Shared bare clone backing the worktree, if any
         
     def __enter__(self):
         """Context manager for automatic cleanup"""
@@ -26,37 +139,123 @@ class RepoInvestigator:
         """Clean up temp directory - guarantees no leftover files"""
         if self.temp_dir:
             self.temp_dir.cleanup()
+        if self.bare_path:
+            # Drop the removed worktree's bookkeeping from the shared clone
+            try:
+                run_git("-C", str(self.bare_path), "worktree", "prune")
+            except (subprocess.SubprocessError, OSError):
+                pass  # Stale entries are pruned by the next investigation
+    
+    async def __aenter__(self):
+        """Async context manager - clone on a worker thread so the event loop stays free"""
+        await asyncio.to_thread(self.clone_repo)
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        """Async cleanup - removing the checkout is blocking disk I/O too"""
+        await asyncio.to_thread(self.__exit__, exc_type, exc_val, exc_tb)
     
     def clone_repo(self) -> Path:
-        """Sandboxed git clone using tempfile - NO os.system()"""
+        """Sandboxed shallow/partial git checkout using tempfile - NO os.system()"""
         self.temp_dir = tempfile.TemporaryDirectory()
         self.repo_path = Path(self.temp_dir.name)
         
         try:
             # Use subprocess with error handling (NOT os.system)
-            result = subprocess.run(
-                ["git", "clone", self.repo_url, str(self.repo_path)],
-                capture_output=True,
-                text=True,
-                timeout=60,
-                check=True
-            )
+            if not self._checkout_from_cache():
+                run_git("clone", *CLONE_ARGS, self.repo_url, str(self.repo_path))
             return self.repo_path
         except subprocess.CalledProcessError as e:
             raise Exception(f"Git clone failed: {e.stderr}")
         except subprocess.TimeoutExpired:
-            raise Exception("Git clone timed out after 60 seconds")
+            raise Exception(f"Git clone timed out after {GIT_TIMEOUT} seconds")
         except Exception as e:
             raise Exception(f"Unexpected error: {str(e)}")
     
+    def _checkout_from_cache(self) -> bool:
+        """
+        Check out a worktree of the cached bare clone into the sandbox.
+        Returns False when the cache can't be used - the caller then clones directly.
+        """
+        bare = REPO_CACHE_DIR / hashlib.sha1(self.repo_url.encode()).hexdigest()
+        
+        if (bare / "HEAD").exists():
+            # Keep the cached history as deep as a fresh clone would be
+            depth = [f"--depth={CLONE_DEPTH}"] if (bare / "shallow").exists() else []
+            try:
+                run_git("-C", str(bare), "fetch", *depth, "--filter=blob:none", "--no-tags", "origin")
+            except subprocess.CalledProcessError:
+                return False  # Concurrent fetch or damaged cache - clone directly
+            revision = "FETCH_HEAD"
+        else:
+            try:
+                REPO_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+                staging = tempfile.mkdtemp(dir=REPO_CACHE_DIR)
+            except OSError:
+                return False  # Caching is best-effort
+            try:
+                run_git("clone", "--bare", *CLONE_ARGS, self.repo_url, staging)
+                os.rename(staging, bare)
+            except OSError:
+                pass  # A concurrent investigation cached it first - use theirs
+            finally:
+                shutil.rmtree(staging, ignore_errors=True)
+            revision = "HEAD"
+        
+        try:
+            run_git("-C", str(bare), "worktree", "add", "--detach", str(self.repo_path), revision)
+        except subprocess.CalledProcessError:
+            # Leave an empty sandbox behind for the direct clone
+            shutil.rmtree(self.repo_path, ignore_errors=True)
+            self.repo_path.mkdir(exist_ok=True)
+            return False
+        self.bare_path = bare
+        return True
+    
+    def _git(self, *args: str) -> str:
+        """Run a read-only git command in the clone and return its stdout"""
+        result = subprocess.run(
+            ["git", "-C", str(self.repo_path), *args],
+            capture_output=True,
+            stdin=subprocess.DEVNULL,
+            encoding="utf-8",
+            errors="replace",
+            timeout=60,
+            check=True
+        )
+        return result.stdout
+    
+    def read_commit_log(self, max_count: int = HISTORY_COMMITS) -> List[Dict[str, Any]]:
+        """Newest-first commits with the number of files each changed vs its first parent"""
+        output = self._git(
+            "log", f"--max-count={max_count}", "--no-renames", "--diff-merges=first-parent",
+            "--name-only", f"--format={GIT_LOG_FORMAT}"
+        )
+        
+        commits = []
+        for record in output.split("\x1e")[1:]:
+            hexsha, committed_date, rest = record.split("\x1f", 2)
+            message, files = rest.rsplit("\x1f", 1)
+            commits.append({
+                "hexsha": hexsha,
+                "committed_date": int(committed_date),
+                "message": message,
+                "files_changed": sum(1 for line in files.splitlines() if line)
+            })
+        return commits
+    
     def analyze_git_history(self) -> Dict[str, Any]:
         """Extract commit history for forensic analysis with progression pattern detection"""
         try:
-            repo = git.Repo(self.repo_path)
-            commits = list(repo.iter_commits())
+            commits = self._git("rev-list", "HEAD").split()
+            recent_commits = self.read_commit_log()
+            # Shallow clones stop at CLONE_DEPTH - the count is then a lower bound
+            # and the oldest commit seen is the clone boundary, not the first commit
+            truncated = self._git("rev-parse", "--is-shallow-repository").strip() == "true"
             
             history = {
                 "total_commits": len(commits),
+                "history_truncated": truncated,
                 "commits": [],
                 "progression_pattern": "unknown",  # NEW: setup_to_tools_to_graph, bulk_upload, mixed
                 "has_progression": False,
@@ -66,28 +265,24 @@ class RepoInvestigator:
             }
             
             # Analyze commits (up to 20 for better pattern detection)
-            for i, commit in enumerate(reversed(commits[:20])):
+            for commit in reversed(recent_commits):
                 commit_data = {
-                    "hash": commit.hexsha[:8],
-                    "message": commit.message.strip(),
-                    "timestamp": datetime.fromtimestamp(commit.committed_date).isoformat(),
-                    "timestamp_epoch": commit.committed_date,  # NEW: for time analysis
-                    "files_changed": len(commit.stats.files)
+                    "hash": commit["hexsha"][:8],
+                    "message": commit["message"].strip(),
+                    "timestamp": datetime.fromtimestamp(commit["committed_date"]).isoformat(),
+                    "timestamp_epoch": commit["committed_date"],  # NEW: for time analysis
+                    "files_changed": commit["files_changed"]
                 }
                 history["commits"].append(commit_data)
-                history["timestamps"].append(commit.committed_date)
+                history["timestamps"].append(commit["committed_date"])
             
             # NEW: Detect progression pattern
-            messages = " ".join([c["message"].lower() for c in history["commits"]])
+            messages = " ".join([c["message"] for c in history["commits"]]).lower()
             
             # Check for setup → tools → graph progression
-            setup_keywords = ["setup", "env", "init", "initial", "bootstrap"]
-            tool_keywords = ["tool", "repo_tools", "doc_tools", "ast", "parser", "git"]
-            graph_keywords = ["graph", "stategraph", "orchestration", "node", "edge", "parallel"]
-            
-            has_setup = any(kw in messages for kw in setup_keywords)
-            has_tools = any(kw in messages for kw in tool_keywords)
-            has_graph = any(kw in messages for kw in graph_keywords)
+            has_setup = any(kw in messages for kw in SETUP_KEYWORDS)
+            has_tools = any(kw in messages for kw in TOOL_KEYWORDS)
+            has_graph = any(kw in messages for kw in GRAPH_KEYWORDS)
             
             if has_setup and has_tools and has_graph:
                 history["progression_pattern"] = "setup_to_tools_to_graph"
@@ -98,10 +293,10 @@ class RepoInvestigator:
                 history["progression_pattern"] = "mixed"
             
             # NEW: Check timestamp clustering (bulk upload detection)
-            if len(history["timestamps"]) > 1:
-                time_diffs = [history["timestamps"][i+1] - history["timestamps"][i] 
-                            for i in range(len(history["timestamps"])-1)]
-                avg_diff = sum(time_diffs) / len(time_diffs)
+            timestamps = history["timestamps"]
+            if len(timestamps) > 1:
+                # Consecutive gaps telescope: their mean is the overall span / gap count
+                avg_diff = (timestamps[-1] - timestamps[0]) / (len(timestamps) - 1)
                 
                 # If average time between commits < 5 minutes, likely bulk upload
                 if avg_diff < 300:  # 5 minutes in seconds
@@ -110,12 +305,13 @@ class RepoInvestigator:
                     history["bulk_upload_detected"] = False
             
             if commits:
-                history["first_commit"] = commits[-1].hexsha[:8]
-                history["last_commit"] = commits[0].hexsha[:8]
+                if not truncated:
+                    history["first_commit"] = commits[-1][:8]
+                history["last_commit"] = commits[0][:8]
                 
             return history
         except Exception as e:
-            return {"error": str(e), "total_commits": 0, "progression_pattern": "error"}
+            return {"error": str(e), "failed": True, "total_commits": 0, "progression_pattern": "error"}
     
     def analyze_graph_structure(self) -> Dict[str, Any]:
         """AST parsing to detect graph architecture - detects structural patterns, not just existence"""
@@ -123,12 +319,8 @@ class RepoInvestigator:
         
         if not graph_file.exists():
             return {"exists": False, "error": "graph.py not found"}
-        
+
         try:
-            with open(graph_file) as f:
-                content = f.read()
-                tree = ast.parse(content)
-            
             analysis = {
                 "exists": True,
                 "has_stategraph": False,
@@ -143,29 +335,68 @@ class RepoInvestigator:
                 "state_reducers": []  # NEW: what reducers are used
             }
             
-            for node in ast.walk(tree):
-                # Look for StateGraph instantiation
-                if isinstance(node, ast.Call) and hasattr(node.func, 'id') and node.func.id == "StateGraph":
-                    analysis["has_stategraph"] = True
+            # Nothing below can fire without one of these names - skip the parse
+            content = read_source(graph_file)
+            if not any(marker in content for marker in GRAPH_MARKERS):
+                return analysis
+            tree = parse_source(graph_file)
+            
+            # Edge sources/targets as written - fan-out and fan-in are decided after the walk
+            start_edges = 0
+            start_conditional = False
+            has_send = False
+            edge_target_counts: Dict[str, int] = {}
+            
+            # One type test per node; walk order (BFS) is kept so list fields stay stable
+            for node in walk_bfs(tree):
+                node_type = type(node)
                 
-                # Look for add_edge calls with pattern detection
-                if isinstance(node, ast.Call) and hasattr(node.func, 'attr') and node.func.attr == "add_edge":
-                    edge_pattern = ast.unparse(node)  # NEW: capture full pattern
-                    analysis["add_edge_patterns"].append(edge_pattern)
-                    analysis["edges"].append("add_edge")
+                if node_type is ast.Call:
+                    func = node.func
+                    func_type = type(func)
                     
-                    # Detect fan-out: multiple edges from START
-                    if len(node.args) >= 2:
-                        first_arg = node.args[0]
-                        if isinstance(first_arg, ast.Name) and first_arg.id == "START":
-                            analysis["has_fan_out"] = True
-                
-                # NEW: Look for add_conditional_edges
-                if isinstance(node, ast.Call) and hasattr(node.func, 'attr') and node.func.attr == "add_conditional_edges":
-                    analysis["conditional_edges"].append(ast.unparse(node))
+                    # Look for StateGraph instantiation
+                    if func_type is ast.Name:
+                        if func.id == "StateGraph":
+                            analysis["has_stategraph"] = True
+                        elif func.id == "Send":
+                            has_send = True
+                        continue
+                    if func_type is not ast.Attribute:
+                        continue
+                    method = func.attr
+                    
+                    # Look for add_edge calls with pattern detection
+                    if method == "add_edge":
+                        edge_pattern = ast.unparse(node)  # NEW: capture full pattern
+                        analysis["add_edge_patterns"].append(edge_pattern)
+                        analysis["edges"].append("add_edge")
+                        
+                        if len(node.args) >= 2:
+                            first_arg = node.args[0]
+                            # Fan-out: multiple edges from START
+                            if type(first_arg) is ast.Name and first_arg.id == "START":
+                                start_edges += 1
+                            # Fan-in: a list of sources joined into one target
+                            elif type(first_arg) is ast.List:
+                                analysis["has_fan_in"] = True
+                            target = ast.unparse(node.args[1])
+                            edge_target_counts[target] = edge_target_counts.get(target, 0) + 1
+                    
+                    # NEW: Look for add_conditional_edges
+                    elif method == "add_conditional_edges":
+                        analysis["conditional_edges"].append(ast.unparse(node))
+                        # A router on START that returns Send objects fans out dynamically
+                        if node.args and type(node.args[0]) is ast.Name and node.args[0].id == "START":
+                            start_conditional = True
+                    
+                    # NEW: Detect node definitions
+                    elif method == "add_node" and node.args:
+                        node_name = ast.unparse(node.args[0]).strip('"\'')
+                        analysis["nodes"].append(node_name)
                 
                 # NEW: Detect reducer usage in Annotated types
-                if isinstance(node, ast.AnnAssign) and hasattr(node.annotation, 'slice'):
+                elif node_type is ast.AnnAssign and type(node.annotation) is ast.Subscript:
                     annotation_str = ast.unparse(node.annotation)
                     if 'Annotated' in annotation_str:
                         if 'operator.add' in annotation_str:
@@ -174,29 +405,23 @@ class RepoInvestigator:
                         if 'operator.ior' in annotation_str:
                             analysis["has_reducers"] = True
                             analysis["state_reducers"].append("operator.ior")
-                
-                # NEW: Detect node definitions
-                if isinstance(node, ast.Call) and hasattr(node.func, 'attr') and node.func.attr == "add_node":
-                    if len(node.args) >= 1:
-                        node_name = ast.unparse(node.args[0]).strip('"\'')
-                        analysis["nodes"].append(node_name)
             
             # Determine parallel execution based on multiple nodes
             if len(analysis["nodes"]) >= 3:
                 analysis["has_parallel"] = True
             
-            # Check for fan-in pattern (multiple edges to same target)
-            edge_targets = []
-            for pattern in analysis["add_edge_patterns"]:
-                if "evidence_aggregator" in pattern:
-                    edge_targets.append("aggregator")
-            if edge_targets.count("aggregator") >= 2:
+            # Fan-out: several static START edges, or Send fan-out from a START router
+            if start_edges >= 2 or (start_conditional and has_send):
+                analysis["has_fan_out"] = True
+            
+            # Fan-in: multiple edges into the same target node
+            if any(count >= 2 for count in edge_target_counts.values()):
                 analysis["has_fan_in"] = True
             
             return analysis
             
         except Exception as e:
-            return {"exists": True, "error": str(e), "has_stategraph": False}
+            return {"exists": True, "error": str(e), "failed": True, "has_stategraph": False}
     
     def check_state_models(self) -> Dict[str, Any]:
         """Verify Pydantic models in state.py"""
@@ -206,8 +431,7 @@ class RepoInvestigator:
             return {"exists": False}
         
         try:
-            with open(state_file) as f:
-                content = f.read()
+            content = read_source(state_file)
             
             analysis = {
                 "exists": True,
@@ -221,7 +445,7 @@ class RepoInvestigator:
             
             return analysis
         except Exception as e:
-            return {"exists": True, "error": str(e)}
+            return {"exists": True, "error": str(e), "failed": True}
     
     def check_sandboxing(self) -> Dict[str, Any]:
         """Verify tools use proper sandboxing"""
@@ -239,20 +463,19 @@ class RepoInvestigator:
         
         for tool_file in tools_files:
             if tool_file.exists():
-                with open(tool_file) as f:
-                    content = f.read()
-                    
-                    if "tempfile.TemporaryDirectory" in content:
-                        analysis["has_tempfile"] = True
-                    
-                    if "subprocess.run" in content:
-                        analysis["has_subprocess"] = True
-                    
-                    if "os.system" in content:
-                        analysis["no_os_system"] = False
-                    
-                    if "try:" in content and "except" in content:
-                        analysis["has_error_handling"] = True
+                content = read_source(tool_file)
+                
+                if "tempfile.TemporaryDirectory" in content:
+                    analysis["has_tempfile"] = True
+                
+                if "subprocess.run" in content:
+                    analysis["has_subprocess"] = True
+                
+                if "os.system" in content:
+                    analysis["no_os_system"] = False
+                
+                if "try:" in content and "except" in content:
+                    analysis["has_error_handling"] = True
         
         return analysis
     def detect_state_reducers(self) -> Dict[str, Any]:
@@ -263,9 +486,7 @@ class RepoInvestigator:
             return {"has_reducers": False, "reducers_found": []}
         
         try:
-            with open(state_file) as f:
-                content = f.read()
-                tree = ast.parse(content)
+            content = read_source(state_file)
             
             result = {
                 "has_reducers": False,
@@ -287,18 +508,27 @@ class RepoInvestigator:
             if "class AgentState(TypedDict)" in content or "AgentState = TypedDict" in content:
                 result["agent_state"] = True
             
-            # Look for Annotated with reducers
-            for node in ast.walk(tree):
-                if isinstance(node, ast.AnnAssign) and hasattr(node.annotation, 'slice'):
-                    annotation_str = ast.unparse(node.annotation)
-                    if 'Annotated' in annotation_str:
-                        if 'operator.add' in annotation_str:
-                            result["has_reducers"] = True
-                            result["reducers_found"].append("operator.add")
-                        if 'operator.ior' in annotation_str:
-                            result["has_reducers"] = True
-                            result["reducers_found"].append("operator.ior")
+            # No Annotated fields means no reducers - skip the parse
+            if "Annotated" not in content:
+                return result
+            
+            # Look for Annotated with reducers - state fields live at module or class
+            # level, so function bodies are never visited (breadth-first like ast.walk)
+            scopes = [parse_source(state_file)]
+            for scope in scopes:
+                for node in scope.body:
+                    if type(node) is ast.ClassDef:
+                        scopes.append(node)
+                    elif type(node) is ast.AnnAssign and type(node.annotation) is ast.Subscript:
+                        annotation_str = ast.unparse(node.annotation)
+                        if 'Annotated' in annotation_str:
+                            if 'operator.add' in annotation_str:
+                                result["has_reducers"] = True
+                                result["reducers_found"].append("operator.add")
+                            if 'operator.ior' in annotation_str:
+                                result["has_reducers"] = True
+                                result["reducers_found"].append("operator.ior")
             
             return result
         except Exception as e:
-            return {"has_reducers": False, "error": str(e)}
\ No newline at end of file
+            return {"has_reducers": False, "error": str(e), "failed": True}
\ No newline at end of file
@@ -20,6 +20,7 @@ def test_evidence_creation():
     from datetime import datetime
     
     ev = Evidence(
+        dimension_id="git_forensic_analysis",
         goal="Test goal",
         found=True,
         location="test.py",
@@ -32,8 +33,40 @@ def test_evidence_creation():
     print("✅ Evidence creation works")
     return True
 
+def test_evidence_structured_content():
+    """Test that structured content is kept raw and serialized on demand"""
+    from src.state import Evidence
+    
+    ev = Evidence(
+        dimension_id="state_management_rigor",
+        goal="Test goal",
+        found=True,
+        content={"has_reducers": True},
+        location="src/state.py",
+        rationale="test",
+        confidence=0.9,
+        collected_by="RepoInvestigator"
+    )
+    assert ev.content == {"has_reducers": True}
+    assert ev.content_text() == '{"has_reducers":true}'
+    assert ev.content_text() is ev.content_text(), "content text not cached"
+    print("✅ Evidence structured content works")
+    return True
+
+def test_merge_evidences_reducer():
+    """Parallel evidence updates merge per source without mutating their inputs"""
+    from src.state import merge_evidences
+    
+    repo, doc, more_repo = ["r1"], ["d1"], ["r2"]
+    left = merge_evidences({}, {"repo": repo})
+    merged = merge_evidences(merge_evidences(left, {"doc": doc}), {"repo": more_repo})
+    assert merged == {"repo": ["r1", "r2"], "doc": ["d1"]}
+    assert left == {"repo": ["r1"]} and repo == ["r1"], "reducer mutated its input"
+    print("✅ Evidence reducer works")
+    return True
+
 if __name__ == "__main__":
     print("Testing state module...")
-    tests = [test_imports, test_evidence_creation]
+    tests = [test_imports, test_evidence_creation, test_evidence_structured_content, test_merge_evidences_reducer]
     passed = sum(1 for t in tests if t())
     print(f"✅ {passed}/{len(tests)} tests passed")
\ No newline at end of file
@@ -25,8 +25,125 @@ def test_doc_tools_basics():
     print("✅ Doc tools have basics")
     return True
 
+def test_concept_batch_matches_single_queries():
+    """Batched concept scan must agree with per-concept queries"""
+    from src.tools.doc_tools import DocAnalyst
+    
+    analyst = DocAnalyst("unused.pdf")
+    analyst.full_text = "State synchronization uses fan-in. Fan-Out splits work."
+    analyst.chunk_text(chunk_size=5, overlap=1)
+    
+    concepts = ["Fan-In", "Fan-Out", "State", "State Synchronization", "Metacognition"]
+    batch = analyst.query_concepts(concepts)
+    for concept in concepts:
+        assert batch[concept] == analyst.query_concept(concept), f"Mismatch for {concept}"
+    print("✅ Batched concept scan matches single queries")
+    return True
+
+def test_cache_dir_defaults():
+    """Caches default to the per-user cache root; an empty XDG_CACHE_HOME counts as unset"""
+    from pathlib import Path
+    from unittest import mock
+    from src.cache_paths import cache_dir
+    
+    with mock.patch.dict(os.environ, {"AUDIT_CACHE_DIR": "", "XDG_CACHE_HOME": ""}):
+        assert cache_dir("pdf") == Path.home() / ".cache" / "automaton-auditor" / "pdf"
+    with mock.patch.dict(os.environ, {"AUDIT_CACHE_DIR": "", "XDG_CACHE_HOME": "/xdg"}):
+        assert cache_dir("pdf") == Path("/xdg/automaton-auditor/pdf")
+    with mock.patch.dict(os.environ, {"AUDIT_CACHE_DIR": "/audit"}):
+        assert cache_dir("pdf") == Path("/audit/pdf")
+    print("✅ Cache directories resolve under the per-user cache root")
+    return True
+
+def test_graph_structure_detects_send_fan_out_and_join():
+    """Fan-out/fan-in detection recognises Send routers and shared edge targets"""
+    import tempfile
+    from pathlib import Path
+    from src.tools.repo_tools import RepoInvestigator
+    
+    send_graph = """
+builder.add_conditional_edges(START, lambda state: [Send(n, state) for n in DETECTIVES])
+builder.add_edge("prosecutor", "chief_justice")
+builder.add_edge("defense", "chief_justice")
+"""
+    static_graph = """
+builder.add_edge(START, "repo")
+builder.add_edge(START, "doc")
+builder.add_edge(["repo", "doc"], "judges")
+"""
+    single_graph = """
+builder.add_edge(START, "repo")
+builder.add_edge("repo", "judge")
+"""
+    expected = {send_graph: True, static_graph: True, single_graph: False}
+    for source, parallel in expected.items():
+        with tempfile.TemporaryDirectory() as tmp:
+            (Path(tmp) / "src").mkdir()
+            (Path(tmp) / "src" / "graph.py").write_text(source)
+            investigator = RepoInvestigator("unused")
+            investigator.repo_path = Path(tmp)
+            analysis = investigator.analyze_graph_structure()
+        assert analysis["has_fan_out"] is parallel, f"has_fan_out wrong for:{source}"
+        assert analysis["has_fan_in"] is parallel, f"has_fan_in wrong for:{source}"
+    print("✅ Graph analysis detects Send fan-out and shared-target fan-in")
+    return True
+
+def _commit(repo, message, files):
+    """Write files (name -> text) into a throwaway repo and commit them"""
+    import subprocess
+    for name, text in files.items():
+        (repo / name).write_text(text)
+    git = ["git", "-C", str(repo), "-c", "user.name=Test", "-c", "user.email=test@example.com"]
+    subprocess.run([*git, "add", "-A"], check=True, capture_output=True)
+    subprocess.run([*git, "commit", "-q", "-m", message], check=True, capture_output=True)
+
+def test_repo_investigator_local_clone():
+    """Commit log parsing, shallow flag and clone cache reuse against a file:// repo"""
+    import subprocess
+    import tempfile
+    from pathlib import Path
+    from unittest import mock
+    from src.tools import repo_tools
+    from src.tools.repo_tools import RepoInvestigator
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        origin = Path(tmp) / "origin"
+        origin.mkdir()
+        subprocess.run(["git", "init", "-q", str(origin)], check=True)
+        _commit(origin, "first", {"a.txt": "1"})
+        _commit(origin, "second", {"a.txt": "2", "b.txt": "2"})
+        _commit(origin, "third", {"c.txt": "3"})
+        _commit(origin, "fourth", {"a.txt": "4", "b.txt": "4", "c.txt": "4"})
+        url = origin.as_uri()
+        
+        # Depth 3 of 4 commits - the clone is shallow
+        clone_args = ["--depth=3", *repo_tools.CLONE_ARGS[1:]]
+        with mock.patch.multiple(repo_tools, REPO_CACHE_DIR=Path(tmp) / "cache",
+                                 CLONE_DEPTH=3, CLONE_ARGS=clone_args):
+            with RepoInvestigator(url) as investigator:
+                commits = investigator.read_commit_log()
+                history = investigator.analyze_git_history()
+                bare_path = investigator.bare_path
+            
+            assert [c["message"].strip() for c in commits] == ["fourth", "third", "second"], "Wrong commit order"
+            assert [c["files_changed"] for c in commits[:2]] == [3, 1], "Wrong file counts"
+            assert history["total_commits"] == 3 and history["history_truncated"], "Shallow clone not flagged"
+            assert history["first_commit"] is None, "Shallow boundary reported as first commit"
+            assert bare_path is not None, "Clone cache not used"
+            
+            # A second investigation reuses the cached clone and fetches the new commit
+            _commit(origin, "fifth", {"d.txt": "5"})
+            with RepoInvestigator(url) as investigator:
+                commits = investigator.read_commit_log()
+                assert investigator.bare_path == bare_path, "Cached clone not reused"
+            assert commits[0]["message"].strip() == "fifth", "New commit not fetched"
+            assert commits[0]["files_changed"] == 1, "Wrong file count for new commit"
+    
+    print("✅ Local clone: commit log, shallow flag and cache reuse")
+    return True
+
 if __name__ == "__main__":
     print("Testing tools module...")
-    tests = [test_repo_tools_sandboxing, test_doc_tools_basics]
+    tests = [test_repo_tools_sandboxing, test_doc_tools_basics, test_concept_batch_matches_single_queries, test_cache_dir_defaults, test_graph_structure_detects_send_fan_out_and_join, test_repo_investigator_local_clone]
     passed = sum(1 for t in tests if t())
     print(f"✅ {passed}/{len(tests)} tests passed")
\ No newline at end of file